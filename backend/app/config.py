@@ -26,11 +26,43 @@ GEMINI_MODEL = "gemini-3-pro-preview"
 GEMINI_TEMPERATURE = 0
 GEMINI_MAX_OUTPUT_TOKENS_EXTRACTION = 2048
 GEMINI_MAX_OUTPUT_TOKENS_ANSWERING = 8192  # Increased from 2048 for longer, complete answers
+EVIDENCE_MAX_TOKENS = int(os.getenv("EVIDENCE_MAX_TOKENS", "32000"))  # Total evidence pack budget
+CHARS_PER_TOKEN = 4  # Rough chars-per-token estimate used to size the evidence budget
+# Max in-flight Gemini extraction calls (bounded by API quota, not threads)
+GEMINI_EXTRACTION_CONCURRENCY = int(os.getenv("GEMINI_EXTRACTION_CONCURRENCY", "5"))
+# Pages per Gemini extraction request (1 = one request per page)
+EXTRACTION_PAGES_PER_REQUEST = int(os.getenv("EXTRACTION_PAGES_PER_REQUEST", "1"))
+# Page images are downscaled to this longest side (pixels) and JPEG-encoded
+# before upload to Gemini; 0 keeps the rendered resolution
+EXTRACTION_IMAGE_MAX_SIDE = int(os.getenv("EXTRACTION_IMAGE_MAX_SIDE", "1568"))
+EXTRACTION_JPEG_QUALITY = int(os.getenv("EXTRACTION_JPEG_QUALITY", "85"))
+# Threads driving poppler rasterization (pdftoppm runs out-of-process, so these use real cores)
+RENDER_WORKERS = int(os.getenv("RENDER_WORKERS", str(max(1, (os.cpu_count() or 2) // 2))))
 
 # Supermemory configuration
 SUPERMEMORY_API_KEY = os.getenv("SUPERMEMORY_API_KEY")
 SUPERMEMORY_BASE_URL = os.getenv("SUPERMEMORY_BASE_URL")  # Optional
 SUPERMEMORY_WORKSPACE_ID = os.getenv("SUPERMEMORY_WORKSPACE_ID")  # Optional
+SUPERMEMORY_INGEST_WORKERS = int(os.getenv("SUPERMEMORY_INGEST_WORKERS", "10"))
+SUPERMEMORY_MAX_CONNECTIONS = int(os.getenv("SUPERMEMORY_MAX_CONNECTIONS", "20"))  # Shared HTTP pool size
+
+# Supermemory circuit breaker: open after N consecutive failures, fail fast for M seconds
+BREAKER_FAILURE_THRESHOLD = int(os.getenv("BREAKER_FAILURE_THRESHOLD", "5"))
+BREAKER_RESET_SECONDS = float(os.getenv("BREAKER_RESET_SECONDS", "30"))
+
+# Reranker configuration (optional; requires transformers and torch)
+RERANKER_ENABLED = os.getenv("RERANKER_ENABLED", "false").lower() in ("1", "true", "yes")
+RERANKER_MODEL = os.getenv("RERANKER_MODEL", "cross-encoder/ms-marco-MiniLM-L6-v2")
+RERANK_OVERSAMPLE = int(os.getenv("RERANK_OVERSAMPLE", "4"))  # Candidates fetched per final result
+RERANKER_BATCH_SIZE = int(os.getenv("RERANKER_BATCH_SIZE", "32"))  # Pairs per forward pass
+RERANKER_ONNX_PATH = os.getenv("RERANKER_ONNX_PATH")  # Optional dir with an exported .onnx model + tokenizer
+
+# Hybrid retrieval: fuse BM25 over page summaries with dense ranks (requires rank_bm25)
+HYBRID_BM25_ENABLED = os.getenv("HYBRID_BM25_ENABLED", "false").lower() in ("1", "true", "yes")
+
+# QA cache configuration (set QA_CACHE_MAXSIZE=0 to disable)
+QA_CACHE_MAXSIZE = int(os.getenv("QA_CACHE_MAXSIZE", "1024"))
+QA_CACHE_TTL = int(os.getenv("QA_CACHE_TTL", "3600"))  # Seconds
 
 # Validate required environment variables
 if not GEMINI_API_KEY:
@@ -53,6 +85,23 @@ Given an image of a document page:
   - entities
   - summary"""
 
+# Appended to EXTRACTION_PROMPT when several pages share one request
+EXTRACTION_BATCH_INSTRUCTION = """
+
+You are given {count} page images, in order. Return a JSON array with exactly {count} objects, one per image, in the same order."""
+
+# Response schema enforced server-side for extraction (JSON mode)
+EXTRACTION_RESPONSE_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {
+        "page_number": {"type": "INTEGER"},
+        "markdown": {"type": "STRING"},
+        "entities": {"type": "ARRAY", "items": {"type": "STRING"}},
+        "summary": {"type": "STRING"},
+    },
+    "required": ["markdown", "entities", "summary"],
+}
+
 # Default values
 DEFAULT_DPI = 150  # Reduced from 200 for faster processing (still good quality)
 DEFAULT_START_PAGE = 1
@@ -0,0 +1,78 @@
+"""BM25 index module - lexical page ranking over manifest summaries."""
+
+import functools
+import logging
+import re
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from app.pipeline.utils import read_json
+
+try:
+    from rank_bm25 import BM25Okapi
+except ImportError:
+    BM25Okapi = None
+
+# Set up logger
+logger = logging.getLogger(__name__)
+
+_TOKEN_RE = re.compile(r'\w+')
+
+
+def _tokenize(text: str) -> List[str]:
+    """Lowercase word tokens."""
+    return _TOKEN_RE.findall(text.lower())
+
+
+@functools.lru_cache(maxsize=32)
+def load_index(manifest_path: str, version: Optional[int]) -> Optional[Tuple]:
+    """
+    Build a BM25 index over the page summaries and entities in a manifest.
+    
+    Cached per (manifest_path, version); pass the manifest mtime as version
+    so re-ingesting a document rebuilds its index.
+    
+    Args:
+        manifest_path: Path to supermemory_manifest.json
+        version: Manifest version (mtime); only used as part of the cache key
+        
+    Returns:
+        tuple: (BM25Okapi, page numbers in index order), or None if
+        rank_bm25 is not installed or the manifest has no summaries
+    """
+    if BM25Okapi is None:
+        logger.warning("rank_bm25 not installed; skipping BM25 ranking")
+        return None
+    
+    try:
+        manifest = read_json(Path(manifest_path))
+    except Exception as e:
+        logger.warning(f"Could not load manifest for BM25 index: {e}")
+        return None
+    
+    pages = []
+    corpus = []
+    for entry in manifest.get('pages', []):
+        text = ' '.join([entry.get('summary', '')] + list(entry.get('entities', [])))
+        tokens = _tokenize(text)
+        if tokens:
+            pages.append(entry['page'])
+            corpus.append(tokens)
+    
+    if not corpus:
+        return None
+    
+    return BM25Okapi(corpus), pages
+
+
+def rank_pages(index: Tuple, question: str) -> Dict[int, int]:
+    """
+    Rank the indexed pages against a question.
+    
+    Returns:
+        dict: page number -> 1-based BM25 rank
+    """
+    bm25, pages = index
+    scores = bm25.get_scores(_tokenize(question))
+    order = sorted(range(len(pages)), key=lambda i: scores[i], reverse=True)
+    return {pages[i]: rank for rank, i in enumerate(order, start=1)}
@@ -1,14 +1,16 @@
 """PDF extraction module - converts PDF pages to compressed JSON using Gemini."""
 
+import asyncio
+import io
 import json
 import logging
 import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Optional
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, FrozenSet, List, Optional
 
 import google.generativeai as genai
-from pdf2image import convert_from_path
+from pdf2image import convert_from_path, pdfinfo_from_path
 from PIL import Image
 
 from app.config import (
@@ -16,13 +18,32 @@ from app.config import (
     GEMINI_MODEL,
     GEMINI_TEMPERATURE,
     GEMINI_MAX_OUTPUT_TOKENS_EXTRACTION,
+    GEMINI_EXTRACTION_CONCURRENCY,
+    RENDER_WORKERS,
     EXTRACTION_PROMPT,
+    EXTRACTION_RESPONSE_SCHEMA,
+    EXTRACTION_BATCH_INSTRUCTION,
+    EXTRACTION_PAGES_PER_REQUEST,
+    EXTRACTION_IMAGE_MAX_SIDE,
+    EXTRACTION_JPEG_QUALITY,
 )
-from app.pipeline.utils import retry, safe_json_loads, ensure_dirs
+from app.pipeline.utils import async_retry, ensure_dirs, json_loads, read_json, write_json
 
 # Set up logger
 logger = logging.getLogger(__name__)
 
+# Dedicated pool for rasterization, kept separate from Gemini concurrency so
+# CPU-bound rendering and network-bound API calls don't cap each other
+_RENDER_POOL: Optional[ThreadPoolExecutor] = None
+
+
+def _get_render_pool() -> ThreadPoolExecutor:
+    """Return the process-wide rendering pool, creating it on first use."""
+    global _RENDER_POOL
+    if _RENDER_POOL is None:
+        _RENDER_POOL = ThreadPoolExecutor(max_workers=RENDER_WORKERS, thread_name_prefix="render")
+    return _RENDER_POOL
+
 
 def get_poppler_path() -> Optional[str]:
     """Get Poppler path from environment variables."""
@@ -48,158 +69,335 @@ def setup_poppler_bin(poppler_path: Optional[str]) -> Optional[str]:
     return str(poppler_bin) if poppler_bin.exists() else None
 
 
-def _call_gemini_with_retry(model, prompt: str, image: Image.Image, page_num: int) -> Optional[str]:
-    """Call Gemini API with retry logic."""
-    def _call():
+def _get_total_pages(pdf_path: Path, poppler_bin: Optional[str]) -> int:
+    """Count PDF pages via pdfinfo, falling back to rasterizing."""
+    # pdfinfo reads the page count without rendering anything
+    try:
+        if poppler_bin:
+            info = pdfinfo_from_path(str(pdf_path), poppler_path=poppler_bin)
+        else:
+            info = pdfinfo_from_path(str(pdf_path))
+        return int(info["Pages"])
+    except Exception as e:
+        logger.warning(f"pdfinfo failed, counting pages by rasterizing: {type(e).__name__}: {e}")
+    
+    # Try to convert a large range to get page count efficiently
+    total_pages = 1
+    try:
+        if poppler_bin:
+            test_images = convert_from_path(
+                str(pdf_path),
+                first_page=1,
+                last_page=1000,
+                poppler_path=poppler_bin
+            )
+        else:
+            test_images = convert_from_path(
+                str(pdf_path),
+                first_page=1,
+                last_page=1000
+            )
+        total_pages = len(test_images)
+    except:
+        # If that fails, try pages sequentially
+        if poppler_bin:
+            for page_num in range(2, 1000):
+                try:
+                    test_imgs = convert_from_path(
+                        str(pdf_path),
+                        first_page=page_num,
+                        last_page=page_num,
+                        poppler_path=poppler_bin
+                    )
+                    if test_imgs:
+                        total_pages = page_num
+                    else:
+                        break
+                except:
+                    break
+        else:
+            for page_num in range(2, 1000):
+                try:
+                    test_imgs = convert_from_path(
+                        str(pdf_path),
+                        first_page=page_num,
+                        last_page=page_num
+                    )
+                    if test_imgs:
+                        total_pages = page_num
+                    else:
+                        break
+                except:
+                    break
+    return total_pages
+
+
+def _render_page(
+    pdf_path: Path,
+    page_num: int,
+    dpi: int,
+    poppler_bin: Optional[str],
+    page_image_path: Path
+) -> Dict:
+    """
+    Rasterize a single PDF page, save it as PNG and encode it for upload.
+    
+    CPU-bound; runs on the dedicated render pool.
+    
+    Returns:
+        dict: JPEG blob of the page for the Gemini request
+        
+    Raises:
+        ValueError: If poppler returns no image for the page
+    """
+    if poppler_bin:
+        images = convert_from_path(
+            str(pdf_path),
+            first_page=page_num,
+            last_page=page_num,
+            dpi=dpi,
+            poppler_path=poppler_bin
+        )
+    else:
+        images = convert_from_path(
+            str(pdf_path),
+            first_page=page_num,
+            last_page=page_num,
+            dpi=dpi
+        )
+    
+    if not images:
+        raise ValueError("No images returned")
+    
+    page_image = images[0]
+    page_image.save(page_image_path)
+    return _encode_page_image(page_image)
+
+
+def _encode_page_image(page_image: Image.Image) -> Dict:
+    """
+    Downscale and JPEG-encode a rendered page for upload to Gemini.
+    
+    The SDK would otherwise encode the full-resolution PIL image losslessly;
+    a bounded-size JPEG is a fraction of the bytes and much cheaper to encode.
+    
+    Returns:
+        dict: Inline blob with 'mime_type' and 'data' keys
+    """
+    if page_image.mode != "RGB":
+        page_image = page_image.convert("RGB")
+    if EXTRACTION_IMAGE_MAX_SIDE > 0 and max(page_image.size) > EXTRACTION_IMAGE_MAX_SIDE:
+        page_image.thumbnail(
+            (EXTRACTION_IMAGE_MAX_SIDE, EXTRACTION_IMAGE_MAX_SIDE), Image.Resampling.LANCZOS
+        )
+    buffer = io.BytesIO()
+    page_image.save(buffer, format="JPEG", quality=EXTRACTION_JPEG_QUALITY)
+    return {"mime_type": "image/jpeg", "data": buffer.getvalue()}
+
+
+def _create_extraction_model(pages_per_request: int = 1):
+    """
+    Configure Gemini and create the model used for page extraction.
+    
+    JSON mode with a response schema makes Gemini return the page fields
+    directly, so responses parse without fence stripping or repair. For
+    multi-page requests the schema is an array of page objects and the
+    output token budget scales with the number of pages.
+    """
+    genai.configure(api_key=GEMINI_API_KEY)
+    if pages_per_request > 1:
+        response_schema = {"type": "ARRAY", "items": EXTRACTION_RESPONSE_SCHEMA}
+    else:
+        response_schema = EXTRACTION_RESPONSE_SCHEMA
+    return genai.GenerativeModel(
+        model_name=GEMINI_MODEL,
+        generation_config={
+            "temperature": GEMINI_TEMPERATURE,
+            "max_output_tokens": GEMINI_MAX_OUTPUT_TOKENS_EXTRACTION * pages_per_request,
+            "response_mime_type": "application/json",
+            "response_schema": response_schema,
+        }
+    )
+
+
+async def _call_gemini_with_retry(model, contents: list, label: str) -> Optional[str]:
+    """Call Gemini API asynchronously with retry logic."""
+    async def _call():
         try:
-            response = model.generate_content([prompt, image])
+            response = await model.generate_content_async(contents)
             if not response or not response.text:
-                logger.warning(f"Page {page_num}: Gemini API returned empty response")
+                logger.warning(f"{label}: Gemini API returned empty response")
                 return None
             return response.text
         except Exception as api_error:
-            logger.error(f"Page {page_num}: Gemini API call failed: {type(api_error).__name__}: {api_error}")
+            logger.error(f"{label}: Gemini API call failed: {type(api_error).__name__}: {api_error}")
             raise
     
     try:
-        return retry(_call, attempts=3)
+        return await async_retry(_call, attempts=3)
     except Exception as e:
-        logger.error(f"Page {page_num}: Gemini API call failed after retries: {type(e).__name__}: {e}")
+        logger.error(f"{label}: Gemini API call failed after retries: {type(e).__name__}: {e}")
+        return None
+
+
+def _scan_page_json_names(pages_dir: Path) -> FrozenSet[str]:
+    """List the file names in pages_dir with a single os.scandir pass."""
+    with os.scandir(pages_dir) as entries:
+        return frozenset(entry.name for entry in entries if entry.is_file())
+
+
+def _load_existing_page(page_num: int, pages_dir: Path, existing_names: FrozenSet[str]) -> Optional[dict]:
+    """
+    Return previously extracted JSON for a page, or None if it must be (re)processed.
+    
+    existing_names comes from _scan_page_json_names, so pages without JSON
+    cost a set lookup instead of a stat call.
+    """
+    page_json_name = f"page_{page_num:03d}.json"
+    if page_json_name not in existing_names:
         return None
+    page_json_path = pages_dir / page_json_name
+    try:
+        page_json = read_json(page_json_path)
+        logger.debug(f"Page {page_num}: Using existing JSON file")
+        return page_json
+    except Exception as e:
+        # If we can't read existing JSON, reprocess
+        logger.warning(f"Page {page_num}: Failed to read existing JSON, will reprocess: {e}")
+        return None
+
+
+def _save_page_json(
+    page_num: int,
+    response_json: dict,
+    page_json_path: Path
+) -> tuple[bool, Optional[str], Optional[dict]]:
+    """
+    Stamp the page number onto an extracted page and save it.
+    
+    Returns:
+        tuple: (success: bool, error_message: str or None, json_data: dict or None)
+    """
+    # Ensure page_number is set correctly
+    response_json["page_number"] = page_num
+    
+    try:
+        write_json(page_json_path, response_json)
+        logger.debug(f"Page {page_num}: JSON saved to {page_json_path}")
+    except Exception as e:
+        error_msg = f"Error saving JSON for page {page_num}: {type(e).__name__}: {e}"
+        logger.error(error_msg)
+        return False, error_msg, None
+    
+    logger.info(f"Page {page_num}: Successfully processed")
+    return True, None, response_json
 
 
-def _process_single_page(
+async def _render_page_async(
     page_num: int,
     pdf_path: Path,
     dpi: int,
     images_dir: Path,
+    poppler_bin: Optional[str]
+) -> tuple[Optional[Dict], Optional[str]]:
+    """
+    Render a page on the render pool.
+    
+    Returns:
+        tuple: (page_image blob or None, error_message or None)
+    """
+    page_image_path = images_dir / f"page_{page_num:03d}.png"
+    logger.debug(f"Page {page_num}: Converting PDF page to image (DPI: {dpi})")
+    loop = asyncio.get_running_loop()
+    try:
+        page_image = await loop.run_in_executor(
+            _get_render_pool(), _render_page, pdf_path, page_num, dpi, poppler_bin, page_image_path
+        )
+        logger.debug(f"Page {page_num}: Image saved to {page_image_path}")
+        return page_image, None
+    except Exception as e:
+        error_msg = f"Error converting page {page_num} to image: {type(e).__name__}: {e}"
+        logger.error(error_msg)
+        return None, error_msg
+
+
+async def _extract_rendered_page(
+    page_num: int,
+    page_image: Dict,
     pages_dir: Path,
-    overwrite: bool = False
+    model,
+    gemini_semaphore: asyncio.Semaphore
 ) -> tuple[bool, Optional[str], Optional[dict]]:
     """
-    Process a single PDF page.
-    
-    Creates its own Gemini model instance for thread safety.
+    Send one rendered page to Gemini and save the extracted JSON.
     
     Returns:
         tuple: (success: bool, error_message: str or None, json_data: dict or None)
     """
-    page_image_path = images_dir / f"page_{page_num:03d}.png"
     page_json_path = pages_dir / f"page_{page_num:03d}.json"
     
-    try:
-        # Skip if JSON exists and not overwriting
-        if not overwrite and page_json_path.exists():
-            try:
-                with open(page_json_path, "r", encoding="utf-8") as f:
-                    logger.debug(f"Page {page_num}: Using existing JSON file")
-                    return True, None, json.load(f)
-            except Exception as e:
-                logger.warning(f"Page {page_num}: Failed to read existing JSON, will reprocess: {e}")
-                # If we can't read existing JSON, reprocess
-                pass
-        
-        # Convert PDF page to image
-        logger.debug(f"Page {page_num}: Converting PDF page to image (DPI: {dpi})")
-        poppler_path = get_poppler_path()
-        poppler_bin = setup_poppler_bin(poppler_path) if poppler_path else None
-        
-        try:
-            if poppler_bin:
-                images = convert_from_path(
-                    str(pdf_path),
-                    first_page=page_num,
-                    last_page=page_num,
-                    dpi=dpi,
-                    poppler_path=poppler_bin
-                )
-            else:
-                images = convert_from_path(
-                    str(pdf_path),
-                    first_page=page_num,
-                    last_page=page_num,
-                    dpi=dpi
-                )
-            
-            if not images:
-                error_msg = f"Failed to convert page {page_num} to image: No images returned"
-                logger.error(error_msg)
-                return False, error_msg, None
-            
-            page_image = images[0]
-            page_image.save(page_image_path)
-            logger.debug(f"Page {page_num}: Image saved to {page_image_path}")
-            
-        except Exception as e:
-            error_msg = f"Error converting page {page_num} to image: {type(e).__name__}: {e}"
-            logger.error(error_msg)
-            return False, error_msg, None
-        
-        # Create model instance for this thread (thread-safe)
-        logger.debug(f"Page {page_num}: Creating Gemini model instance")
-        if not GEMINI_API_KEY:
-            error_msg = f"Page {page_num}: GEMINI_API_KEY not found"
-            logger.error(error_msg)
-            return False, error_msg, None
-        
-        # Configure Gemini (this is thread-safe as it's just setting a global config)
-        genai.configure(api_key=GEMINI_API_KEY)
-        
-        # Create a new model instance for this thread
-        model = genai.GenerativeModel(
-            model_name=GEMINI_MODEL,
-            generation_config={
-                "temperature": GEMINI_TEMPERATURE,
-                "max_output_tokens": GEMINI_MAX_OUTPUT_TOKENS_EXTRACTION,
-            }
+    # Call Gemini API
+    logger.debug(f"Page {page_num}: Calling Gemini API")
+    async with gemini_semaphore:
+        response_text = await _call_gemini_with_retry(
+            model, [EXTRACTION_PROMPT, page_image], f"Page {page_num}"
         )
+    
+    if response_text is None:
+        error_msg = f"Page {page_num}: Gemini API call failed after retries"
+        logger.error(error_msg)
+        return False, error_msg, None
+    
+    logger.debug(f"Page {page_num}: Gemini API response received ({len(response_text)} chars)")
+    
+    # Parse response as JSON (schema-enforced, so no repair path)
+    try:
+        response_json = json_loads(response_text)
+    except json.JSONDecodeError as e:
+        error_msg = f"Page {page_num}: Gemini returned invalid JSON: {e}"
+        logger.error(error_msg)
+        return False, error_msg, None
+    if not isinstance(response_json, dict):
+        error_msg = f"Page {page_num}: Gemini returned {type(response_json).__name__} JSON, expected an object"
+        logger.error(error_msg)
+        return False, error_msg, None
+    
+    # Encoding and the write run off the event loop
+    return await asyncio.to_thread(_save_page_json, page_num, response_json, page_json_path)
+
+
+async def _process_single_page(
+    page_num: int,
+    pdf_path: Path,
+    dpi: int,
+    images_dir: Path,
+    pages_dir: Path,
+    model,
+    poppler_bin: Optional[str],
+    gemini_semaphore: asyncio.Semaphore,
+    existing_names: FrozenSet[str] = frozenset()
+) -> tuple[bool, Optional[str], Optional[dict]]:
+    """
+    Process a single PDF page.
+    
+    Rendering runs on the render pool; only the Gemini call holds a slot of
+    gemini_semaphore, so pages render while other pages await the API.
+    existing_names holds the page JSON files to reuse (empty when overwriting).
+    
+    Returns:
+        tuple: (success: bool, error_message: str or None, json_data: dict or None)
+    """
+    try:
+        # Skip if JSON already exists (read off the event loop)
+        existing = await asyncio.to_thread(_load_existing_page, page_num, pages_dir, existing_names)
+        if existing is not None:
+            return True, None, existing
         
-        # Call Gemini API
-        logger.debug(f"Page {page_num}: Calling Gemini API")
-        response_text = _call_gemini_with_retry(model, EXTRACTION_PROMPT, page_image, page_num)
-        
-        if response_text is None:
-            error_msg = f"Page {page_num}: Gemini API call failed after retries"
-            logger.error(error_msg)
-            return False, error_msg, None
-        
-        logger.debug(f"Page {page_num}: Gemini API response received ({len(response_text)} chars)")
-        
-        # Parse response as JSON
-        response_json = safe_json_loads(response_text)
-        
-        # If parsing failed, wrap response into JSON structure
-        if response_json is None:
-            logger.warning(f"Page {page_num}: Failed to parse JSON response, wrapping as markdown")
-            response_json = {
-                "page_number": page_num,
-                "markdown": response_text,
-                "entities": [],
-                "summary": ""
-            }
-        else:
-            # Ensure page_number is set correctly
-            response_json["page_number"] = page_num
-            # Ensure required fields exist
-            if "markdown" not in response_json:
-                response_json["markdown"] = response_text
-            if "entities" not in response_json:
-                response_json["entities"] = []
-            if "summary" not in response_json:
-                response_json["summary"] = ""
-        
-        # Save JSON response
-        try:
-            with open(page_json_path, "w", encoding="utf-8") as f:
-                json.dump(response_json, f, indent=2, ensure_ascii=False)
-            logger.debug(f"Page {page_num}: JSON saved to {page_json_path}")
-        except Exception as e:
-            error_msg = f"Error saving JSON for page {page_num}: {type(e).__name__}: {e}"
-            logger.error(error_msg)
+        page_image, error_msg = await _render_page_async(page_num, pdf_path, dpi, images_dir, poppler_bin)
+        if page_image is None:
             return False, error_msg, None
         
-        logger.info(f"Page {page_num}: Successfully processed")
-        return True, None, response_json
+        return await _extract_rendered_page(page_num, page_image, pages_dir, model, gemini_semaphore)
         
     except Exception as e:
         error_msg = f"Page {page_num}: Unexpected error: {type(e).__name__}: {e}"
@@ -207,14 +405,101 @@ def _process_single_page(
         return False, error_msg, None
 
 
-def extract_pdf_to_page_jsons(
+async def _process_page_batch(
+    page_nums: List[int],
+    pdf_path: Path,
+    dpi: int,
+    images_dir: Path,
+    pages_dir: Path,
+    model,
+    batch_model,
+    poppler_bin: Optional[str],
+    gemini_semaphore: asyncio.Semaphore,
+    existing_names: FrozenSet[str] = frozenset()
+) -> List[tuple[int, tuple[bool, Optional[str], Optional[dict]]]]:
+    """
+    Process several PDF pages with a single Gemini request.
+    
+    Pages that already have JSON are skipped. If the response is not a list
+    of exactly one JSON object per image, the rendered pages are retried one
+    request per page with the single-page model.
+    
+    Returns:
+        list: (page_num, (success, error_message, json_data)) per page, in order
+    """
+    results: Dict[int, tuple] = {}
+    pending: List[int] = []
+    existing_pages = await asyncio.gather(*(
+        asyncio.to_thread(_load_existing_page, page_num, pages_dir, existing_names) for page_num in page_nums
+    ))
+    for page_num, existing in zip(page_nums, existing_pages):
+        if existing is not None:
+            results[page_num] = (True, None, existing)
+        else:
+            pending.append(page_num)
+    
+    renders = await asyncio.gather(*(
+        _render_page_async(page_num, pdf_path, dpi, images_dir, poppler_bin) for page_num in pending
+    ))
+    rendered: List[tuple[int, Dict]] = []
+    for page_num, (page_image, error_msg) in zip(pending, renders):
+        if page_image is None:
+            results[page_num] = (False, error_msg, None)
+        else:
+            rendered.append((page_num, page_image))
+    
+    if len(rendered) == 1:
+        page_num, page_image = rendered[0]
+        results[page_num] = await _extract_rendered_page(page_num, page_image, pages_dir, model, gemini_semaphore)
+    elif rendered:
+        label = f"Pages {rendered[0][0]}-{rendered[-1][0]}"
+        prompt = EXTRACTION_PROMPT + EXTRACTION_BATCH_INSTRUCTION.format(count=len(rendered))
+        logger.debug(f"{label}: Calling Gemini API with {len(rendered)} images")
+        async with gemini_semaphore:
+            response_text = await _call_gemini_with_retry(
+                batch_model, [prompt] + [image for _, image in rendered], label
+            )
+        
+        page_jsons = None
+        if response_text is not None:
+            try:
+                page_jsons = json_loads(response_text)
+            except json.JSONDecodeError as e:
+                logger.warning(f"{label}: Gemini returned invalid JSON: {e}")
+        
+        if (
+            isinstance(page_jsons, list)
+            and len(page_jsons) == len(rendered)
+            and all(isinstance(page_json, dict) for page_json in page_jsons)
+        ):
+            saved = await asyncio.gather(*(
+                asyncio.to_thread(_save_page_json, page_num, response_json, pages_dir / f"page_{page_num:03d}.json")
+                for (page_num, _), response_json in zip(rendered, page_jsons)
+            ))
+            for (page_num, _), result in zip(rendered, saved):
+                results[page_num] = result
+        else:
+            logger.warning(f"{label}: Batched extraction failed, retrying pages individually")
+            page_results = await asyncio.gather(*(
+                _extract_rendered_page(page_num, page_image, pages_dir, model, gemini_semaphore)
+                for page_num, page_image in rendered
+            ))
+            for (page_num, _), result in zip(rendered, page_results):
+                results[page_num] = result
+    
+    return [(page_num, results[page_num]) for page_num in page_nums]
+
+
+async def extract_pdf_to_page_jsons_async(
     pdf_path: Path,
     out_pages_dir: Path,
     images_dir: Path,
     dpi: int = 200,
     start_page: int = 1,
     end_page: Optional[int] = None,
-    overwrite: bool = False
+    overwrite: bool = False,
+    max_workers: int = GEMINI_EXTRACTION_CONCURRENCY,
+    pages_per_request: int = EXTRACTION_PAGES_PER_REQUEST
 ) -> Dict:
     """
     Extract PDF pages to compressed JSON files using Gemini.
@@ -227,6 +512,8 @@ def extract_pdf_to_page_jsons(
         start_page: Start page (1-indexed)
         end_page: End page (1-indexed, None for all pages)
         overwrite: Whether to overwrite existing files
+        max_workers: Maximum number of concurrent Gemini calls
+        pages_per_request: Pages sent to Gemini per request (1 disables batching)
         
     Returns:
         dict: Statistics with keys: pages_total, processed_pages, failed_pages
@@ -234,65 +521,19 @@ def extract_pdf_to_page_jsons(
     # Ensure directories exist
     ensure_dirs(out_pages_dir, images_dir)
     
-    # Validate API key (model instances will be created per thread)
+    # Validate API key
     if not GEMINI_API_KEY:
         raise ValueError("GEMINI_API_KEY not found in environment variables")
     
     logger.info(f"Starting PDF extraction: {pdf_path}, pages {start_page}-{end_page or 'all'}, DPI: {dpi}")
     
+    poppler_path = get_poppler_path()
+    poppler_bin = setup_poppler_bin(poppler_path) if poppler_path else None
+    loop = asyncio.get_running_loop()
+    
     # Get total number of pages
     try:
-        poppler_path = get_poppler_path()
-        poppler_bin = setup_poppler_bin(poppler_path) if poppler_path else None
-        
-        # Try to convert a large range to get page count efficiently
-        total_pages = 1
-        try:
-            if poppler_bin:
-                test_images = convert_from_path(
-                    str(pdf_path),
-                    first_page=1,
-                    last_page=1000,
-                    poppler_path=poppler_bin
-                )
-            else:
-                test_images = convert_from_path(
-                    str(pdf_path),
-                    first_page=1,
-                    last_page=1000
-                )
-            total_pages = len(test_images)
-        except:
-            # If that fails, try pages sequentially
-            if poppler_bin:
-                for page_num in range(2, 1000):
-                    try:
-                        test_imgs = convert_from_path(
-                            str(pdf_path),
-                            first_page=page_num,
-                            last_page=page_num,
-                            poppler_path=poppler_bin
-                        )
-                        if test_imgs:
-                            total_pages = page_num
-                        else:
-                            break
-                    except:
-                        break
-            else:
-                for page_num in range(2, 1000):
-                    try:
-                        test_imgs = convert_from_path(
-                            str(pdf_path),
-                            first_page=page_num,
-                            last_page=page_num
-                        )
-                        if test_imgs:
-                            total_pages = page_num
-                        else:
-                            break
-                    except:
-                        break
+        total_pages = await loop.run_in_executor(_get_render_pool(), _get_total_pages, pdf_path, poppler_bin)
     except Exception as e:
         raise Exception(f"Error reading PDF: {e}")
     
@@ -304,53 +545,67 @@ def extract_pdf_to_page_jsons(
     if start_page > end_page:
         raise ValueError(f"start_page ({start_page}) > end_page ({end_page})")
     
-    # Process pages in parallel for faster processing
+    # Process pages concurrently: renders feed the render pool while the
+    # semaphore bounds in-flight Gemini calls
     processed_pages: List[int] = []
     failed_pages: List[Dict] = []
     
-    # Use ThreadPoolExecutor for parallel processing
-    # Process 5 pages concurrently (adjust based on API rate limits)
-    max_workers = 5
+    # Model instances are shared: all calls run on this event loop
+    pages_per_request = max(1, pages_per_request)
+    model = _create_extraction_model()
+    batch_model = _create_extraction_model(pages_per_request) if pages_per_request > 1 else None
+    gemini_semaphore = asyncio.Semaphore(max_workers)
+    # One directory scan up front instead of a stat per page
+    existing_names = frozenset() if overwrite else _scan_page_json_names(out_pages_dir)
+    # Requests admitted to the pipeline: one in-flight Gemini call plus one
+    # prefetched render per worker. The next image is ready when a call
+    # returns, without rasterizing (and holding) the whole document up front.
+    pipeline_window = asyncio.Semaphore(max_workers * 2)
     
-    def process_page_wrapper(page_num):
-        """Wrapper function for parallel processing. Each thread creates its own model instance."""
+    async def process_chunk_wrapper(page_nums):
+        """Process a chunk of pages, converting unexpected errors into failure results."""
         try:
-            logger.debug(f"Page {page_num}: Starting processing in thread")
-            result = _process_single_page(
-                page_num, pdf_path, dpi, images_dir, out_pages_dir, overwrite
-            )
-            return page_num, result
+            async with pipeline_window:
+                logger.debug(f"Pages {page_nums}: Starting processing")
+                if batch_model is None:
+                    page_num = page_nums[0]
+                    result = await _process_single_page(
+                        page_num, pdf_path, dpi, images_dir, out_pages_dir, model, poppler_bin,
+                        gemini_semaphore, existing_names
+                    )
+                    return [(page_num, result)]
+                return await _process_page_batch(
+                    page_nums, pdf_path, dpi, images_dir, out_pages_dir, model, batch_model,
+                    poppler_bin, gemini_semaphore, existing_names
+                )
         except Exception as e:
-            logger.error(f"Page {page_num}: Exception in process_page_wrapper: {type(e).__name__}: {e}", exc_info=True)
-            return page_num, (False, f"Wrapper exception: {type(e).__name__}: {e}", None)
-    
-    logger.info(f"Processing {end_page - start_page + 1} pages with {max_workers} workers")
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        # Submit all pages for processing
-        future_to_page = {
-            executor.submit(process_page_wrapper, page_num): page_num 
-            for page_num in range(start_page, end_page + 1)
-        }
-        
-        # Collect results as they complete
-        for future in as_completed(future_to_page):
-            try:
-                page_num, (success, error, json_data) = future.result()
-                if success:
-                    processed_pages.append(page_num)
-                    logger.debug(f"Page {page_num}: Added to processed pages")
-                else:
-                    error_entry = {"page": page_num, "error": error or "Unknown error"}
-                    failed_pages.append(error_entry)
-                    logger.error(f"Page {page_num}: Failed - {error}")
-            except Exception as e:
-                page_num = future_to_page.get(future, "unknown")
-                error_entry = {"page": page_num, "error": f"Processing error: {type(e).__name__}: {e}"}
-                failed_pages.append(error_entry)
-                logger.error(f"Page {page_num}: Exception collecting result: {type(e).__name__}: {e}", exc_info=True)
-    
-    # Sort processed_pages for consistent output
-    processed_pages.sort()
+            logger.error(f"Pages {page_nums}: Exception in process_chunk_wrapper: {type(e).__name__}: {e}", exc_info=True)
+            return [
+                (page_num, (False, f"Wrapper exception: {type(e).__name__}: {e}", None))
+                for page_num in page_nums
+            ]
+    
+    page_range = list(range(start_page, end_page + 1))
+    chunks = [
+        page_range[i:i + pages_per_request]
+        for i in range(0, len(page_range), pages_per_request)
+    ]
+    
+    logger.info(
+        f"Processing {len(page_range)} pages with concurrency {max_workers}, "
+        f"{pages_per_request} page(s) per request, {RENDER_WORKERS} render workers"
+    )
+    chunk_results = await asyncio.gather(*(process_chunk_wrapper(chunk) for chunk in chunks))
+    results = [item for chunk_result in chunk_results for item in chunk_result]
+    
+    for page_num, (success, error, json_data) in results:
+        if success:
+            processed_pages.append(page_num)
+            logger.debug(f"Page {page_num}: Added to processed pages")
+        else:
+            error_entry = {"page": page_num, "error": error or "Unknown error"}
+            failed_pages.append(error_entry)
+            logger.error(f"Page {page_num}: Failed - {error}")
     
     logger.info(f"PDF extraction complete: {len(processed_pages)} processed, {len(failed_pages)} failed")
     if failed_pages:
@@ -362,3 +617,32 @@ def extract_pdf_to_page_jsons(
         "failed_pages": failed_pages
     }
 
+
+def extract_pdf_to_page_jsons(
+    pdf_path: Path,
+    out_pages_dir: Path,
+    images_dir: Path,
+    dpi: int = 200,
+    start_page: int = 1,
+    end_page: Optional[int] = None,
+    overwrite: bool = False,
+    max_workers: int = GEMINI_EXTRACTION_CONCURRENCY,
+    pages_per_request: int = EXTRACTION_PAGES_PER_REQUEST
+) -> Dict:
+    """
+    Synchronous wrapper around extract_pdf_to_page_jsons_async.
+    
+    Must not be called from a running event loop; async callers should
+    await extract_pdf_to_page_jsons_async directly.
+    """
+    return asyncio.run(extract_pdf_to_page_jsons_async(
+        pdf_path=pdf_path,
+        out_pages_dir=out_pages_dir,
+        images_dir=images_dir,
+        dpi=dpi,
+        start_page=start_page,
+        end_page=end_page,
+        overwrite=overwrite,
+        max_workers=max_workers,
+        pages_per_request=pages_per_request
+    ))
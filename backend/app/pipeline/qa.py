@@ -1,37 +1,199 @@
 """Question answering module - retrieves from Supermemory and generates answers with Gemini."""
 
-import json
+import functools
+import hashlib
+import inspect
+import logging
+import operator
+import re
+import string
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Any, Callable, Dict, Hashable, List, Optional
 
 import google.generativeai as genai
+from cachetools import TTLCache
 
 from app.config import (
     GEMINI_API_KEY,
     GEMINI_MODEL,
     GEMINI_TEMPERATURE,
     GEMINI_MAX_OUTPUT_TOKENS_ANSWERING,
-    SUPERMEMORY_API_KEY,
-    SUPERMEMORY_BASE_URL,
-    SUPERMEMORY_WORKSPACE_ID,
+    EVIDENCE_MAX_TOKENS,
+    CHARS_PER_TOKEN,
+    RERANKER_ENABLED,
+    RERANK_OVERSAMPLE,
+    HYBRID_BM25_ENABLED,
+    QA_CACHE_MAXSIZE,
+    QA_CACHE_TTL,
 )
-from app.pipeline.utils import retry
+from app.pipeline import bm25_index, rerank
+from app.pipeline.supermemory_client import get_supermemory_client
+from app.pipeline.utils import SUPERMEMORY_BREAKER, read_json, retry
 
+# Set up logger
+logger = logging.getLogger(__name__)
 
-def _get_supermemory_client():
-    """Initialize and return Supermemory client."""
-    if not SUPERMEMORY_API_KEY:
-        raise ValueError("SUPERMEMORY_API_KEY not found in environment variables")
+# Length of the per-page excerpt returned in the retrieved list
+EXCERPT_CHARS = 250
+
+# Answer returned when no retrieved page has usable content
+NOT_FOUND_ANSWER = "Not found in provided pages."
+
+# Separator between pages in the evidence pack
+_EVIDENCE_SEPARATOR = "\n\n---\n\n"
+
+# Appended to pages cut to fit the evidence budget
+_TRUNCATION_MARKER = "... [truncated]"
+
+# Smallest truncated page excerpt added to the evidence pack
+_MIN_EVIDENCE_CHARS = 100
+
+# Worker threads for multi-question retrieval and answering
+QA_BATCH_WORKERS = 8
+
+# In-memory caches for retrieval results and final answers, keyed on the
+# normalized question hash, doc_id, request parameters, and manifest version
+_RETRIEVAL_CACHE = TTLCache(maxsize=max(QA_CACHE_MAXSIZE, 1), ttl=QA_CACHE_TTL)
+_ANSWER_CACHE = TTLCache(maxsize=max(QA_CACHE_MAXSIZE, 1), ttl=QA_CACHE_TTL)
+_CACHE_LOCK = threading.Lock()
+_WHITESPACE_RE = re.compile(r'\s+')
+
+# Answering prompt, compiled once at import
+_ANSWER_PROMPT_TEMPLATE = string.Template("""You are answering a question based ONLY on the provided evidence pack. Use ONLY the information present in the evidence pack. If the information is not present, explicitly state "Not found in provided pages."
+
+CRITICAL CITATION REQUIREMENTS:
+- Every non-trivial claim MUST have an inline citation in the format: ($doc_id p.<page_number>)
+- If multiple pages support a claim, cite all relevant pages: ($doc_id p.X, p.Y)
+- Use citations immediately after each claim or fact
+- Format: ($doc_id p.1) or ($doc_id p.1, p.2) for multiple pages
+
+Question: $question
+
+Evidence Pack:
+$evidence_pack
+
+Answer (with citations):""")
+
+
+def _question_key(question: str) -> str:
+    """Hash a question after normalizing case and whitespace."""
+    normalized = _WHITESPACE_RE.sub(' ', question.strip().lower())
+    return hashlib.blake2b(normalized.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def _manifest_version(manifest_path: Optional[Path]) -> Optional[int]:
+    """Return the manifest mtime so re-ingesting a document invalidates its cache entries."""
+    if not manifest_path:
+        return None
+    try:
+        return manifest_path.stat().st_mtime_ns
+    except OSError:
+        return None
+
+
+def _cache_get(cache: TTLCache, key: Hashable):
+    """Thread-safe cache read; returns None on a miss or when caching is disabled."""
+    if QA_CACHE_MAXSIZE <= 0:
+        return None
+    with _CACHE_LOCK:
+        return cache.get(key)
+
+
+def _cache_set(cache: TTLCache, key: Hashable, value) -> None:
+    """Thread-safe cache write (no-op when caching is disabled)."""
+    if QA_CACHE_MAXSIZE <= 0:
+        return
+    with _CACHE_LOCK:
+        cache[key] = value
+
+
+def _cached_answer(key: Hashable) -> Optional[Dict]:
+    """Return a fresh copy of a cached answer so callers cannot mutate the cache."""
+    cached = _cache_get(_ANSWER_CACHE, key)
+    if cached is None:
+        return None
+    answer_md, retrieved = cached
+    return {"answer_md": answer_md, "retrieved": [dict(r) for r in retrieved]}
+
+
+def _cache_answer(key: Hashable, answer: Dict) -> None:
+    """Cache an answer as immutable data, skipping empty or not-found answers."""
+    if not answer["retrieved"] or answer["answer_md"].strip() == NOT_FOUND_ANSWER:
+        return
+    retrieved = tuple(tuple(r.items()) for r in answer["retrieved"])
+    _cache_set(_ANSWER_CACHE, key, (answer["answer_md"], retrieved))
+
+
+def _cache_results(key: Hashable, results: List[Any]) -> None:
+    """Cache retrieval results; empty result lists are not cached."""
+    if results:
+        _cache_set(_RETRIEVAL_CACHE, key, tuple(results))
+
+
+def _accepts_keyword(method: Callable, name: str) -> bool:
+    """Whether method's signature takes the keyword name (True if it can't be inspected)."""
+    try:
+        parameters = inspect.signature(method).parameters
+    except (TypeError, ValueError):
+        return True
+    return name in parameters or any(
+        p.kind is inspect.Parameter.VAR_KEYWORD for p in parameters.values()
+    )
+
+
+@functools.lru_cache(maxsize=4)
+def _resolve_search_fn(client) -> Callable[[str, int, Optional[dict]], Any]:
+    """
+    Probe the SDK once for its search method and return a bound wrapper.
+    
+    The wrapper takes (query, limit, filter). If the SDK's search method does
+    not take a filter argument, or rejects it as an unexpected keyword, it
+    queries unfiltered with a doubled limit so results can be filtered
+    client-side.
+    
+    Returns:
+        callable: (query, limit, filter) -> raw SDK response
+    """
+    # Try common SDK search patterns
+    if hasattr(client, 'search') and hasattr(client.search, 'query'):
+        method = client.search.query
+        call = lambda query, limit, **kw: method(q=query, limit=limit, **kw)
+    elif hasattr(client, 'search') and hasattr(client.search, 'documents'):
+        method = client.search.documents
+        call = lambda query, limit, **kw: method(q=query, limit=limit, **kw)
+    elif hasattr(client, 'query'):
+        method = client.query
+        call = lambda query, limit, **kw: method(query=query, limit=limit, **kw)
+    elif hasattr(client, 'search'):
+        method = client.search
+        call = lambda query, limit, **kw: method(query, limit=limit, **kw)
+    else:
+        raise AttributeError("Could not find search method in Supermemory client")
     
-    from supermemory import Supermemory
+    # Decided from the signature up front; a call only changes it when the SDK
+    # rejects the filter keyword itself, never on other errors
+    filter_supported = _accepts_keyword(method, 'filter')
+    filter_lock = threading.Lock()
     
-    client_kwargs = {'api_key': SUPERMEMORY_API_KEY}
-    if SUPERMEMORY_BASE_URL:
-        client_kwargs['base_url'] = SUPERMEMORY_BASE_URL
-    if SUPERMEMORY_WORKSPACE_ID:
-        client_kwargs['workspace_id'] = SUPERMEMORY_WORKSPACE_ID
+    def _search(query: str, limit: int, filter: Optional[dict] = None):
+        nonlocal filter_supported
+        if filter is None:
+            return call(query, limit)
+        if filter_supported:
+            try:
+                return call(query, limit, filter=filter)
+            except TypeError as e:
+                if "unexpected keyword argument 'filter'" not in str(e):
+                    raise
+                with filter_lock:
+                    filter_supported = False
+                logger.warning("Supermemory search rejected the filter argument; filtering results client-side")
+        # Fallback: query without filter, filter results after
+        return call(query, limit * 2)
     
-    return Supermemory(**client_kwargs)
+    return _search
 
 
 def _query_supermemory(client, query: str, doc_id: str, top_k: int) -> List:
@@ -41,71 +203,149 @@ def _query_supermemory(client, query: str, doc_id: str, top_k: int) -> List:
     Returns:
         list: List of result objects with memory_id, content, and metadata
     """
+    search = _resolve_search_fn(client)
+    
     def _call():
-        # Try common SDK search patterns
-        if hasattr(client, 'search') and hasattr(client.search, 'query'):
-            try:
-                response = client.search.query(q=query, limit=top_k, filter={'doc_id': doc_id})
-            except (TypeError, AttributeError):
-                # Fallback: query without filter, filter results after
-                response = client.search.query(q=query, limit=top_k * 2)
-        elif hasattr(client, 'search') and hasattr(client.search, 'documents'):
-            try:
-                response = client.search.documents(q=query, limit=top_k, filter={'doc_id': doc_id})
-            except (TypeError, AttributeError):
-                response = client.search.documents(q=query, limit=top_k * 2)
-        elif hasattr(client, 'query'):
-            try:
-                response = client.query(query=query, limit=top_k, filter={'doc_id': doc_id})
-            except (TypeError, AttributeError):
-                response = client.query(query=query, limit=top_k * 2)
-        elif hasattr(client, 'search'):
-            try:
-                response = client.search(query, limit=top_k, filter={'doc_id': doc_id})
-            except (TypeError, AttributeError):
-                response = client.search(query, limit=top_k * 2)
-        else:
-            raise AttributeError("Could not find search method in Supermemory client")
+        response = search(query, top_k, {'doc_id': doc_id})
+        return _filter_response(response, doc_id, top_k)
+    
+    return retry(_call, attempts=3, breaker=SUPERMEMORY_BREAKER)
+
+
+def _metadata_generic(result) -> Dict:
+    """Read metadata from a result of unknown shape."""
+    if hasattr(result, 'metadata'):
+        return result.metadata
+    elif isinstance(result, dict):
+        return result.get('metadata', {})
+    return {}
+
+
+def _make_metadata_getter(sample) -> Callable[[Any], Dict]:
+    """
+    Pick a metadata reader for a batch of results based on one sample.
+    
+    Returns:
+        callable: result -> metadata dict
+    """
+    if isinstance(sample, dict):
+        reader = lambda result: result.get('metadata', {})
+    elif hasattr(sample, 'metadata'):
+        reader = operator.attrgetter('metadata')
+    else:
+        return _metadata_generic
+    
+    def _get(result):
+        try:
+            return reader(result)
+        except AttributeError:
+            # Result doesn't match the batch's sampled shape
+            return _metadata_generic(result)
+    return _get
+
+
+def _filter_response(response, doc_id: str, top_k: int) -> List:
+    """
+    Unwrap a search response and keep at most top_k results for doc_id.
+    
+    Returns:
+        list: Result objects whose metadata doc_id matches
+    """
+    # Extract results
+    if hasattr(response, 'results'):
+        results = response.results
+    elif hasattr(response, 'data'):
+        results = response.data
+    elif isinstance(response, list):
+        results = response
+    else:
+        results = [response]
+    
+    if not results:
+        return []
+    
+    # Filter by doc_id if not done by SDK
+    get_metadata = _make_metadata_getter(results[0])
+    filtered_results = []
+    for result in results:
+        # Check if doc_id matches
+        if (get_metadata(result) or {}).get('doc_id') == doc_id:
+            filtered_results.append(result)
+            if len(filtered_results) >= top_k:
+                break
+    
+    return filtered_results[:top_k]
+
+
+def _resolve_batch_search(client) -> Optional[Callable]:
+    """Return the SDK's batch search method, or None if the client has none."""
+    search = getattr(client, 'search', None)
+    if search is not None and hasattr(search, 'batch'):
+        return search.batch
+    if hasattr(client, 'batch_query'):
+        return client.batch_query
+    return None
+
+
+def _query_supermemory_batch(client, queries: List[str], doc_id: str, top_k: int) -> List[List]:
+    """
+    Query Supermemory for several questions at once.
+    
+    Uses the SDK's batch search endpoint when available (one round-trip for
+    all queries); otherwise runs the single-query path on a thread pool.
+    
+    Returns:
+        list: One filtered result list per query, in input order
+    """
+    batch_fn = _resolve_batch_search(client)
+    if batch_fn is not None:
+        def _call():
+            response = batch_fn(queries=[
+                {'q': query, 'limit': top_k, 'filter': {'doc_id': doc_id}}
+                for query in queries
+            ])
+            responses = response.results if hasattr(response, 'results') else response
+            if not isinstance(responses, list) or len(responses) != len(queries):
+                raise ValueError("Batch search returned an unexpected number of responses")
+            return responses
         
-        # Extract results
-        if hasattr(response, 'results'):
-            results = response.results
-        elif hasattr(response, 'data'):
-            results = response.data
-        elif isinstance(response, list):
-            results = response
+        # TypeError/ValueError mean the SDK doesn't support this call shape:
+        # fall back at once, and don't count it as a success or failure of
+        # the service
+        try:
+            responses = retry(_call, attempts=3, breaker=SUPERMEMORY_BREAKER, no_retry=(TypeError, ValueError))
+        except (TypeError, ValueError) as e:
+            logger.warning(f"Batch search unsupported, falling back to per-query search: {e}")
+        except Exception as e:
+            logger.warning(f"Batch search failed, falling back to per-query search: {type(e).__name__}: {e}")
         else:
-            results = [response]
-        
-        # Filter by doc_id if not done by SDK
-        filtered_results = []
-        for result in results:
-            # Extract metadata
-            if hasattr(result, 'metadata'):
-                metadata = result.metadata
-            elif isinstance(result, dict):
-                metadata = result.get('metadata', {})
-            else:
-                metadata = {}
-            
-            # Check if doc_id matches
-            if metadata.get('doc_id') == doc_id:
-                filtered_results.append(result)
-                if len(filtered_results) >= top_k:
-                    break
-        
-        return filtered_results[:top_k]
+            return [_filter_response(r, doc_id, top_k) for r in responses]
     
-    return retry(_call, attempts=3)
+    with ThreadPoolExecutor(max_workers=QA_BATCH_WORKERS) as executor:
+        return list(executor.map(lambda q: _query_supermemory(client, q, doc_id, top_k), queries))
 
 
-def _extract_result_info(result, manifest: Optional[Dict]) -> Optional[tuple]:
+def _build_page_index(manifest: Optional[Dict]) -> Dict[str, int]:
     """
-    Extract memory_id, page number, and content from a Supermemory result.
+    Build a memory_id -> page number index from a manifest.
+    
+    Pages that reused another page's memory (duplicate_of) are left out, so
+    a shared memory_id maps to the page it was uploaded for.
     
     Returns:
-        tuple: (memory_id, page_number, content) or None if extraction fails
+        dict: Mapping of memory_id to page number (empty if no manifest)
     """
+    if not manifest:
+        return {}
+    return {
+        p['memory_id']: p['page']
+        for p in manifest.get('pages', [])
+        if 'memory_id' in p and 'page' in p and 'duplicate_of' not in p
+    }
+
+
+def _result_fields_generic(result) -> tuple:
+    """Read (memory_id, metadata, content) from a result of unknown shape."""
     # Extract memory_id
     if hasattr(result, 'id'):
         memory_id = result.id
@@ -122,18 +362,6 @@ def _extract_result_info(result, manifest: Optional[Dict]) -> Optional[tuple]:
     else:
         metadata = {}
     
-    # Get page number from metadata or map via manifest
-    page_number = metadata.get('page')
-    if page_number is None and manifest:
-        # Try to find page number from manifest using memory_id
-        for page_entry in manifest.get('pages', []):
-            if page_entry.get('memory_id') == memory_id:
-                page_number = page_entry.get('page')
-                break
-    
-    if page_number is None:
-        return None
-    
     # Extract content
     content = None
     if hasattr(result, 'content'):
@@ -143,6 +371,64 @@ def _extract_result_info(result, manifest: Optional[Dict]) -> Optional[tuple]:
     elif isinstance(result, dict):
         content = result.get('content') or result.get('text')
     
+    return memory_id, metadata, content
+
+
+def _result_fields_dict(result) -> tuple:
+    """Read (memory_id, metadata, content) from a dict result."""
+    return (
+        result.get('id') or result.get('memory_id', ''),
+        result.get('metadata', {}),
+        result.get('content') or result.get('text'),
+    )
+
+
+def _make_result_extractor(sample) -> Callable[[Any], tuple]:
+    """
+    Pick a field reader for a batch of results based on one sample.
+    
+    Results from a single SDK response share a shape, so the hasattr /
+    isinstance probing is done once per batch instead of once per result.
+    
+    Returns:
+        callable: result -> (memory_id, metadata, content)
+    """
+    if isinstance(sample, dict):
+        return _result_fields_dict
+    if hasattr(sample, 'id') and hasattr(sample, 'metadata'):
+        if hasattr(sample, 'content'):
+            return operator.attrgetter('id', 'metadata', 'content')
+        if hasattr(sample, 'text'):
+            return operator.attrgetter('id', 'metadata', 'text')
+    return _result_fields_generic
+
+
+def _extract_result_info(
+    result,
+    mem_to_page: Dict[str, int],
+    extractor: Callable[[Any], tuple] = _result_fields_generic
+) -> Optional[tuple]:
+    """
+    Extract memory_id, page number, content, and excerpt from a Supermemory result.
+    
+    Returns:
+        tuple: (memory_id, page_number, content, excerpt) or None if extraction fails
+    """
+    try:
+        memory_id, metadata, content = extractor(result)
+    except AttributeError:
+        # Result doesn't match the batch's sampled shape
+        memory_id, metadata, content = _result_fields_generic(result)
+    metadata = metadata or {}
+    
+    # Get page number from metadata or map via manifest index
+    page_number = metadata.get('page')
+    if page_number is None:
+        page_number = mem_to_page.get(memory_id)
+    
+    if page_number is None:
+        return None
+    
     # Ensure content is not None and is a string
     if content is None:
         content = str(result) if result else ''
@@ -153,58 +439,126 @@ def _extract_result_info(result, manifest: Optional[Dict]) -> Optional[tuple]:
     if not content.strip():
         return None
     
-    return memory_id, page_number, content
+    return memory_id, page_number, content, content[:EXCERPT_CHARS]
+
+
+def _extract_result_infos(results: List, mem_to_page: Dict[str, int]) -> List[tuple]:
+    """
+    Extract (memory_id, page_number, content, excerpt) for each usable result.
+    
+    Done once per answer so reranking, the evidence pack, and the retrieved
+    list share the same extraction work.
+    
+    Returns:
+        list: Info tuples in result order, skipping results without a page or content
+    """
+    if not results:
+        return []
+    
+    extractor = _make_result_extractor(results[0])
+    infos = []
+    for result in results:
+        info = _extract_result_info(result, mem_to_page, extractor)
+        if info is not None:
+            infos.append(info)
+    return infos
 
 
-def _build_evidence_pack(results: List, manifest: Optional[Dict], doc_id: str, max_chars_per_page: int) -> str:
+def _fuse_bm25(question: str, infos: List[tuple], index: tuple) -> List[tuple]:
     """
-    Build evidence pack string from retrieved results.
+    Reorder extracted results by Reciprocal Rank Fusion of dense and BM25 ranks.
+    
+    Pages missing from the BM25 index rank after every indexed page.
+    
+    Returns:
+        list: Info tuples, best fused rank first
+    """
+    bm25_ranks = bm25_index.rank_pages(index, question)
+    missing_rank = len(bm25_ranks) + 1
+    fused = [
+        (1.0 / (rerank.RRF_K + dense_rank) + 1.0 / (rerank.RRF_K + bm25_ranks.get(info[1], missing_rank)), info)
+        for dense_rank, info in enumerate(infos, start=1)
+    ]
+    fused.sort(key=lambda item: item[0], reverse=True)
+    return [info for _, info in fused]
+
+
+def _rerank_infos(question: str, infos: List[tuple], top_k: int) -> List[tuple]:
+    """
+    Reorder extracted results with the cross-encoder and keep the top_k.
+    
+    Falls back to the original retrieval order if reranking fails.
+    
+    Returns:
+        list: At most top_k info tuples, most relevant first
+    """
+    try:
+        order = rerank.rerank(question, [info[2] for info in infos], top_k)
+    except Exception as e:
+        logger.warning(f"Reranking failed, using retrieval order: {type(e).__name__}: {e}")
+        return infos[:top_k]
+    
+    return [infos[i] for i in order]
+
+
+def _build_evidence_pack(
+    infos: List[tuple],
+    max_chars_per_page: int,
+    max_total_chars: int = EVIDENCE_MAX_TOKENS * CHARS_PER_TOKEN
+) -> str:
+    """
+    Build evidence pack string from extracted results.
+    
+    Each page is capped at max_chars_per_page, and the whole pack, including
+    headers, separators, and truncation markers, stays within max_total_chars
+    (the token budget converted with CHARS_PER_TOKEN), so the prompt never
+    carries evidence Gemini would drop. Pages stop being added once less than
+    a short excerpt's worth of budget is left.
     
     Returns:
         str: Formatted evidence pack
     """
     evidence_sections = []
+    remaining = max_total_chars
+    # A truncated page shorter than this isn't worth its header
+    min_chars = min(_MIN_EVIDENCE_CHARS, max_chars_per_page)
     
-    for result in results:
-        info = _extract_result_info(result, manifest)
-        if info is None:
-            continue
-        
-        memory_id, page_number, content = info
-        
-        # Skip if content is None or empty
-        if not content or not isinstance(content, str):
-            continue
+    for memory_id, page_number, content, _ in infos:
+        header = f"[Page {page_number} | memory_id={memory_id}]\n"
+        overhead = len(header) + (len(_EVIDENCE_SEPARATOR) if evidence_sections else 0)
+        available = remaining - overhead
+        if available < min_chars:
+            break
         
-        # Truncate content if needed
-        if len(content) > max_chars_per_page:
-            content = content[:max_chars_per_page] + "... [truncated]"
+        # Truncate content if needed, keeping the marker within the budget
+        if len(content) > min(max_chars_per_page, available):
+            budget = min(max_chars_per_page, available - len(_TRUNCATION_MARKER))
+            if budget < min_chars:
+                break
+            content = content[:budget] + _TRUNCATION_MARKER
         
-        section = f"[Page {page_number} | memory_id={memory_id}]\n{content}"
-        evidence_sections.append(section)
+        evidence_sections.append(header + content)
+        remaining -= overhead + len(content)
     
-    return "\n\n---\n\n".join(evidence_sections)
-
-
-def _generate_answer_with_gemini(question: str, evidence_pack: str, doc_id: str, model_name: str) -> str:
-    """Use Gemini to generate an answer from the evidence pack with citations."""
-    prompt = f"""You are answering a question based ONLY on the provided evidence pack. Use ONLY the information present in the evidence pack. If the information is not present, explicitly state "Not found in provided pages."
+    return _EVIDENCE_SEPARATOR.join(evidence_sections)
 
-CRITICAL CITATION REQUIREMENTS:
-- Every non-trivial claim MUST have an inline citation in the format: ({doc_id} p.<page_number>)
-- If multiple pages support a claim, cite all relevant pages: ({doc_id} p.X, p.Y)
-- Use citations immediately after each claim or fact
-- Format: ({doc_id} p.1) or ({doc_id} p.1, p.2) for multiple pages
 
-Question: {question}
+@functools.lru_cache(maxsize=16)
+def _get_answer_model(model_name: str):
+    """Return a cached Gemini model instance for answering."""
+    return genai.GenerativeModel(model_name)
 
-Evidence Pack:
-{evidence_pack}
 
-Answer (with citations):"""
+def _generate_answer_with_gemini(question: str, evidence_pack: str, doc_id: str, model_name: str) -> str:
+    """Use Gemini to generate an answer from the evidence pack with citations."""
+    prompt = _ANSWER_PROMPT_TEMPLATE.substitute(
+        doc_id=doc_id,
+        question=question,
+        evidence_pack=evidence_pack
+    )
     
     def _call():
-        model = genai.GenerativeModel(model_name)
+        model = _get_answer_model(model_name)
         response = model.generate_content(
             prompt,
             generation_config=genai.types.GenerationConfig(
@@ -217,6 +571,102 @@ Answer (with citations):"""
     return retry(_call, attempts=3)
 
 
+def _fetch_k(top_k: int) -> int:
+    """Number of candidates to retrieve; overfetch when a reordering stage runs."""
+    if RERANKER_ENABLED or HYBRID_BM25_ENABLED:
+        return top_k * RERANK_OVERSAMPLE
+    return top_k
+
+
+def _load_bm25(manifest_path: Optional[Path], version: Optional[int]) -> Optional[tuple]:
+    """Return the document's BM25 index when hybrid retrieval is enabled."""
+    if not HYBRID_BM25_ENABLED or not manifest_path:
+        return None
+    return bm25_index.load_index(str(manifest_path), version)
+
+
+def _load_manifest(manifest_path: Optional[Path]) -> Optional[Dict]:
+    """Load the ingestion manifest if it exists, else return None."""
+    if manifest_path and manifest_path.exists():
+        try:
+            return read_json(manifest_path)
+        except Exception:
+            pass
+    return None
+
+
+@functools.lru_cache(maxsize=32)
+def _load_page_index(manifest_path: Optional[Path], version: Optional[int]) -> Dict[str, int]:
+    """
+    Load a manifest and build its memory_id -> page index.
+    
+    Cached per (manifest_path, version); pass the manifest mtime as version
+    so re-ingesting a document rebuilds its index. The returned dict is
+    shared between callers and must not be mutated.
+    """
+    return _build_page_index(_load_manifest(manifest_path))
+
+
+def _configure_gemini() -> None:
+    """Configure the Gemini SDK with the API key from config."""
+    if not GEMINI_API_KEY:
+        raise ValueError("GEMINI_API_KEY not found in environment variables")
+    
+    genai.configure(api_key=GEMINI_API_KEY)
+
+
+def _answer_from_results(
+    question: str,
+    doc_id: str,
+    results: List,
+    mem_to_page: Dict[str, int],
+    top_k: int,
+    max_chars_per_page: int,
+    model: str,
+    bm25: Optional[tuple] = None
+) -> Dict:
+    """
+    Rerank retrieved results, build the evidence pack, and generate an answer.
+    
+    Returns:
+        dict: {"answer_md": str, "retrieved": List[Dict]}
+    """
+    # Extract fields once; every later step reuses these tuples
+    infos = _extract_result_infos(results, mem_to_page)
+    if bm25 is not None and infos:
+        infos = _fuse_bm25(question, infos, bm25)
+    if RERANKER_ENABLED and infos:
+        infos = _rerank_infos(question, infos, top_k)
+    infos = infos[:top_k]
+    
+    # Build evidence pack
+    evidence_pack = _build_evidence_pack(infos, max_chars_per_page)
+    
+    if not evidence_pack:
+        return {
+            "answer_md": NOT_FOUND_ANSWER,
+            "retrieved": []
+        }
+    
+    # Generate answer with Gemini
+    answer_md = _generate_answer_with_gemini(question, evidence_pack, doc_id, model)
+    
+    # Build retrieved list
+    retrieved = [
+        {
+            "page": page_number,
+            "memory_id": memory_id,
+            "excerpt": excerpt
+        }
+        for memory_id, page_number, _, excerpt in infos
+    ]
+    
+    return {
+        "answer_md": answer_md,
+        "retrieved": retrieved
+    }
+
+
 def answer_question(
     doc_id: str,
     question: str,
@@ -243,58 +693,104 @@ def answer_question(
     if model is None:
         model = GEMINI_MODEL
     
-    # Configure Gemini
-    if not GEMINI_API_KEY:
-        raise ValueError("GEMINI_API_KEY not found in environment variables")
+    # Return a cached answer for the same question against the same ingestion
+    question_key = _question_key(question)
+    version = _manifest_version(manifest_path)
+    answer_key = (question_key, doc_id, model, top_k, max_chars_per_page, version)
+    cached = _cached_answer(answer_key)
+    if cached is not None:
+        return cached
     
-    genai.configure(api_key=GEMINI_API_KEY)
+    _configure_gemini()
     
-    # Load manifest if provided
-    manifest = None
-    if manifest_path and manifest_path.exists():
-        try:
-            with open(manifest_path, 'r', encoding='utf-8') as f:
-                manifest = json.load(f)
-        except Exception:
-            pass
+    # Index memory_id -> page once so per-result lookups are O(1)
+    mem_to_page = _load_page_index(manifest_path, version)
     
-    # Query Supermemory
-    client = _get_supermemory_client()
-    results = _query_supermemory(client, question, doc_id, top_k)
+    # Overfetch candidates when reranking, then keep the best top_k
+    fetch_k = _fetch_k(top_k)
+    retrieval_key = (question_key, doc_id, fetch_k, version)
+    results = _cache_get(_RETRIEVAL_CACHE, retrieval_key)
+    if results is None:
+        # Query Supermemory
+        client = get_supermemory_client()
+        results = _query_supermemory(client, question, doc_id, fetch_k)
+        _cache_results(retrieval_key, results)
     
-    if not results:
-        return {
-            "answer_md": "Not found in provided pages.",
-            "retrieved": []
-        }
+    answer = _answer_from_results(
+        question, doc_id, results, mem_to_page, top_k, max_chars_per_page, model,
+        bm25=_load_bm25(manifest_path, version)
+    )
+    _cache_answer(answer_key, answer)
+    return answer
+
+
+def answer_questions(
+    doc_id: str,
+    questions: List[str],
+    top_k: int = 8,
+    max_chars_per_page: int = 1500,
+    model: str = None,
+    manifest_path: Optional[Path] = None
+) -> List[Dict]:
+    """
+    Answer several questions about one document.
     
-    # Build evidence pack
-    evidence_pack = _build_evidence_pack(results, manifest, doc_id, max_chars_per_page)
+    Retrieval goes through a single batch search when the SDK supports it,
+    and answers are generated concurrently.
     
-    if not evidence_pack:
-        return {
-            "answer_md": "Not found in provided pages.",
-            "retrieved": []
-        }
+    Args:
+        doc_id: Document ID
+        questions: User questions
+        top_k: Number of top results to retrieve per question
+        max_chars_per_page: Maximum characters per page in evidence pack
+        model: Gemini model to use (default: GEMINI_MODEL from config)
+        manifest_path: Optional path to manifest file
+        
+    Returns:
+        list: One {"answer_md": str, "retrieved": List[Dict]} per question, in input order
+    """
+    if not questions:
+        return []
     
-    # Generate answer with Gemini
-    answer_md = _generate_answer_with_gemini(question, evidence_pack, doc_id, model)
+    # Use default model if not specified
+    if model is None:
+        model = GEMINI_MODEL
     
-    # Build retrieved list
-    retrieved = []
-    for result in results:
-        info = _extract_result_info(result, manifest)
-        if info:
-            memory_id, page_number, content = info
-            excerpt = content[:250] if len(content) > 250 else content
-            retrieved.append({
-                "page": page_number,
-                "memory_id": memory_id,
-                "excerpt": excerpt
-            })
+    question_keys = [_question_key(q) for q in questions]
+    version = _manifest_version(manifest_path)
+    answer_keys = [(k, doc_id, model, top_k, max_chars_per_page, version) for k in question_keys]
+    answers = [_cached_answer(key) for key in answer_keys]
+    pending = [i for i, answer in enumerate(answers) if answer is None]
+    if not pending:
+        return answers
     
-    return {
-        "answer_md": answer_md,
-        "retrieved": retrieved
-    }
-
+    _configure_gemini()
+    
+    mem_to_page = _load_page_index(manifest_path, version)
+    
+    # Reuse cached retrieval results; batch-query the rest
+    fetch_k = _fetch_k(top_k)
+    retrieval_keys = {i: (question_keys[i], doc_id, fetch_k, version) for i in pending}
+    results = {i: _cache_get(_RETRIEVAL_CACHE, retrieval_keys[i]) for i in pending}
+    to_query = [i for i in pending if results[i] is None]
+    if to_query:
+        client = get_supermemory_client()
+        fetched = _query_supermemory_batch(client, [questions[i] for i in to_query], doc_id, fetch_k)
+        for i, result_list in zip(to_query, fetched):
+            results[i] = result_list
+            _cache_results(retrieval_keys[i], result_list)
+    
+    bm25 = _load_bm25(manifest_path, version)
+    with ThreadPoolExecutor(max_workers=QA_BATCH_WORKERS) as executor:
+        generated = executor.map(
+            lambda i: _answer_from_results(
+                questions[i], doc_id, results[i], mem_to_page, top_k, max_chars_per_page, model,
+                bm25=bm25
+            ),
+            pending
+        )
+        for i, answer in zip(pending, generated):
+            answers[i] = answer
+            _cache_answer(answer_keys[i], answer)
+    
+    return answers
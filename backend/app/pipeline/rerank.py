@@ -0,0 +1,196 @@
+"""Reranking module - reorders retrieved passages with a local cross-encoder."""
+
+import functools
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from app.config import RERANKER_MODEL, RERANKER_BATCH_SIZE, RERANKER_ONNX_PATH
+
+# Set up logger
+logger = logging.getLogger(__name__)
+
+# Reciprocal Rank Fusion constant
+RRF_K = 60
+
+# Serializes model loading so concurrent first requests load it only once
+_LOAD_LOCK = threading.Lock()
+
+# Models that failed to load -> reason; lru_cache doesn't cache exceptions,
+# so without this every request would retry from_pretrained
+_UNAVAILABLE: Dict[str, str] = {}
+
+
+@functools.lru_cache(maxsize=2)
+def _load_reranker(model_name: str) -> Tuple:
+    """Load tokenizer and cross-encoder (torch and transformers are imported lazily)."""
+    import torch  # noqa: F401 - fail here, not per request, if torch is missing
+    from transformers import AutoModelForSequenceClassification, AutoTokenizer
+    
+    logger.info(f"Loading reranker model: {model_name}")
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    model = AutoModelForSequenceClassification.from_pretrained(model_name)
+    model.eval()
+    return tokenizer, model
+
+
+def _get_reranker(model_name: str) -> Tuple:
+    """
+    Return the loaded tokenizer and cross-encoder, loading them once per process.
+    
+    Raises:
+        RuntimeError: If the model failed to load, now or on an earlier call
+    """
+    with _LOAD_LOCK:
+        reason = _UNAVAILABLE.get(model_name)
+        if reason is None:
+            try:
+                return _load_reranker(model_name)
+            except Exception as e:
+                reason = f"{type(e).__name__}: {e}"
+                _UNAVAILABLE[model_name] = reason
+                logger.warning(f"Reranker {model_name} failed to load; reranking disabled: {reason}")
+    raise RuntimeError(f"Reranker {model_name} unavailable: {reason}")
+
+
+@functools.lru_cache(maxsize=2)
+def _get_onnx_reranker(onnx_dir: str) -> Optional[Tuple]:
+    """
+    Load an exported (optionally int8-quantized) ONNX cross-encoder.
+    
+    Returns:
+        tuple: (tokenizer, session, input names), or None if onnxruntime is
+        not installed or the model can't be loaded
+    """
+    try:
+        import onnxruntime as ort
+        from transformers import AutoTokenizer
+    except ImportError:
+        logger.warning("onnxruntime not installed; using the PyTorch reranker")
+        return None
+    
+    onnx_files = sorted(Path(onnx_dir).glob('*.onnx'))
+    if not onnx_files:
+        logger.warning(f"No .onnx file found in {onnx_dir}; using the PyTorch reranker")
+        return None
+    
+    options = ort.SessionOptions()
+    # Physical cores: hyperthreads don't add GEMM throughput
+    options.intra_op_num_threads = max(1, (os.cpu_count() or 2) // 2)
+    
+    logger.info(f"Loading ONNX reranker: {onnx_files[0]}")
+    try:
+        tokenizer = AutoTokenizer.from_pretrained(onnx_dir)
+        session = ort.InferenceSession(str(onnx_files[0]), options, providers=['CPUExecutionProvider'])
+    except Exception as e:
+        # Cached like the other None returns, so the load isn't retried per request
+        logger.warning(f"Failed to load ONNX reranker ({type(e).__name__}: {e}); using the PyTorch reranker")
+        return None
+    input_names = {inp.name for inp in session.get_inputs()}
+    return tokenizer, session, input_names
+
+
+def _score_batches(passages: List[str], batch_size: int, score_batch) -> List[float]:
+    """
+    Score passages in length-sorted batches so each batch pads to a similar length.
+    
+    Returns:
+        list: Relevance score per passage, in input order
+    """
+    order = sorted(range(len(passages)), key=lambda i: len(passages[i]))
+    scores = [0.0] * len(passages)
+    
+    for start in range(0, len(order), batch_size):
+        idx = order[start:start + batch_size]
+        for i, score in zip(idx, score_batch([passages[i] for i in idx])):
+            scores[i] = score
+    
+    return scores
+
+
+def _score_pairs(question: str, passages: List[str], model_name: str, batch_size: int) -> List[float]:
+    """
+    Score (question, passage) pairs, one forward pass per padded batch.
+    
+    Uses the ONNX Runtime model from RERANKER_ONNX_PATH when configured and
+    loadable, otherwise the PyTorch model.
+    
+    Returns:
+        list: Relevance score per passage, in input order
+    """
+    onnx = None
+    if RERANKER_ONNX_PATH:
+        with _LOAD_LOCK:
+            onnx = _get_onnx_reranker(RERANKER_ONNX_PATH)
+    if onnx is not None:
+        tokenizer, session, input_names = onnx
+        
+        def score_batch(batch_passages):
+            batch = tokenizer(
+                [question] * len(batch_passages),
+                batch_passages,
+                padding=True,
+                truncation=True,
+                return_tensors="np",
+            )
+            feeds = {name: batch[name] for name in input_names if name in batch}
+            return session.run(None, feeds)[0].reshape(-1).tolist()
+        
+        return _score_batches(passages, batch_size, score_batch)
+    
+    tokenizer, model = _get_reranker(model_name)
+    
+    import torch
+    
+    def score_batch(batch_passages):
+        batch = tokenizer(
+            [question] * len(batch_passages),
+            batch_passages,
+            padding=True,
+            truncation=True,
+            return_tensors="pt",
+        )
+        return model(**batch).logits.squeeze(-1).tolist()
+    
+    with torch.inference_mode():
+        return _score_batches(passages, batch_size, score_batch)
+
+
+def rerank(
+    question: str,
+    passages: List[str],
+    top_k: int,
+    model_name: str = RERANKER_MODEL,
+    batch_size: int = RERANKER_BATCH_SIZE,
+) -> List[int]:
+    """
+    Rerank passages by fusing cross-encoder and retrieval ranks.
+    
+    Passages are assumed to be in retrieval order. Each passage gets
+    1/(k + cross-encoder rank) + 1/(k + retrieval rank), which keeps the
+    cross-encoder from dominating on short passages.
+    
+    Args:
+        question: User question
+        passages: Candidate passage texts, in retrieval order
+        top_k: Number of indices to return
+        model_name: Cross-encoder model name
+        batch_size: Pairs per forward pass
+        
+    Returns:
+        list: Indices into passages, most relevant first, at most top_k long
+    """
+    if not passages:
+        return []
+    
+    scores = _score_pairs(question, passages, model_name, batch_size)
+    by_score = sorted(range(len(passages)), key=lambda i: scores[i], reverse=True)
+    ce_rank = {i: rank for rank, i in enumerate(by_score, start=1)}
+    
+    fused = {
+        i: 1.0 / (RRF_K + ce_rank[i]) + 1.0 / (RRF_K + i + 1)
+        for i in range(len(passages))
+    }
+    return sorted(fused, key=fused.get, reverse=True)[:top_k]
@@ -0,0 +1,98 @@
+"""Shared Supermemory client - one pooled HTTP transport for ingestion and QA."""
+
+import functools
+import logging
+
+import httpx
+import supermemory
+from supermemory import AsyncSupermemory, Supermemory
+
+from app.config import (
+    SUPERMEMORY_API_KEY,
+    SUPERMEMORY_BASE_URL,
+    SUPERMEMORY_WORKSPACE_ID,
+    SUPERMEMORY_MAX_CONNECTIONS,
+)
+
+# Set up logger
+logger = logging.getLogger(__name__)
+
+
+def _http_client_kwargs() -> dict:
+    """
+    Transport settings shared by the sync and async clients.
+    
+    HTTP/2 is used when the h2 package is installed, so concurrent requests
+    share one multiplexed connection instead of one TLS handshake per worker.
+    """
+    try:
+        import h2  # noqa: F401
+        http2 = True
+    except ImportError:
+        http2 = False
+    
+    return {
+        'http2': http2,
+        'limits': httpx.Limits(
+            max_keepalive_connections=SUPERMEMORY_MAX_CONNECTIONS,
+            max_connections=SUPERMEMORY_MAX_CONNECTIONS,
+        ),
+    }
+
+
+def _client_kwargs() -> dict:
+    """
+    Supermemory constructor arguments from config.
+    
+    Raises:
+        ValueError: If SUPERMEMORY_API_KEY is not configured
+    """
+    if not SUPERMEMORY_API_KEY:
+        raise ValueError("SUPERMEMORY_API_KEY not found in environment variables")
+    
+    client_kwargs = {'api_key': SUPERMEMORY_API_KEY}
+    if SUPERMEMORY_BASE_URL:
+        client_kwargs['base_url'] = SUPERMEMORY_BASE_URL
+    if SUPERMEMORY_WORKSPACE_ID:
+        client_kwargs['workspace_id'] = SUPERMEMORY_WORKSPACE_ID
+    return client_kwargs
+
+
+@functools.lru_cache(maxsize=1)
+def get_supermemory_client() -> Supermemory:
+    """
+    Return the process-wide Supermemory client.
+    
+    Raises:
+        ValueError: If SUPERMEMORY_API_KEY is not configured
+    """
+    client_kwargs = _client_kwargs()
+    
+    # Prefer the SDK's client subclass so its default timeouts are kept
+    http_client_cls = getattr(supermemory, 'DefaultHttpxClient', httpx.Client)
+    try:
+        return Supermemory(http_client=http_client_cls(**_http_client_kwargs()), **client_kwargs)
+    except TypeError:
+        # Older SDKs don't accept a custom transport
+        logger.warning("Supermemory SDK does not accept http_client; using its default transport")
+        return Supermemory(**client_kwargs)
+
+
+def create_async_supermemory_client() -> AsyncSupermemory:
+    """
+    Create an async Supermemory client with a pooled keep-alive transport.
+    
+    Not cached: async connections are bound to the event loop that opened
+    them, so use one client per ingestion run (``async with``).
+    
+    Raises:
+        ValueError: If SUPERMEMORY_API_KEY is not configured
+    """
+    client_kwargs = _client_kwargs()
+    
+    http_client_cls = getattr(supermemory, 'DefaultAsyncHttpxClient', httpx.AsyncClient)
+    try:
+        return AsyncSupermemory(http_client=http_client_cls(**_http_client_kwargs()), **client_kwargs)
+    except TypeError:
+        logger.warning("Supermemory SDK does not accept http_client; using its default transport")
+        return AsyncSupermemory(**client_kwargs)
@@ -1,20 +1,32 @@
 """Supermemory ingestion module - ingests page JSON files into Supermemory."""
 
+import asyncio
+import hashlib
 import json
+import logging
+import os
 import re
 from pathlib import Path
-from typing import Dict, List, Optional
-from glob import glob
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Dict, List, Optional
 
-from supermemory import Supermemory
-
-from app.config import (
-    SUPERMEMORY_API_KEY,
-    SUPERMEMORY_BASE_URL,
-    SUPERMEMORY_WORKSPACE_ID,
+from app.config import SUPERMEMORY_INGEST_WORKERS
+from app.pipeline.supermemory_client import create_async_supermemory_client
+from app.pipeline.utils import (
+    SUPERMEMORY_BREAKER,
+    async_retry,
+    read_json,
+    safe_json_loads,
+    write_json,
 )
-from app.pipeline.utils import retry, safe_json_loads
+
+# Set up logger
+logger = logging.getLogger(__name__)
+
+# Error reported for pages that carry no text worth uploading
+_EMPTY_PAGE_ERROR = 'Page has no markdown or raw_response content'
+
+# Page number from a page JSON filename (page_001.json -> 1)
+_PAGE_NUM_RE = re.compile(r'page_(\d+)\.json')
 
 
 def parse_json_file(file_path: Path) -> Dict:
@@ -24,8 +36,7 @@ def parse_json_file(file_path: Path) -> Dict:
     Returns:
         dict: Parsed data with 'markdown', 'entities', 'summary', 'page_number'
     """
-    with open(file_path, 'r', encoding='utf-8') as f:
-        outer_data = json.load(f)
+    outer_data = read_json(file_path)
     
     # Extract raw_response if present
     raw_response = outer_data.get('raw_response', '')
@@ -50,61 +61,78 @@ def parse_json_file(file_path: Path) -> Dict:
     return outer_data
 
 
-def _ingest_page_with_retry(client, content: str, metadata: Dict) -> str:
-    """Ingest a page into Supermemory with retry logic."""
-    def _call():
-        # Try common SDK patterns
-        if hasattr(client, 'memories') and hasattr(client.memories, 'create'):
-            response = client.memories.create(content=content, metadata=metadata)
-        elif hasattr(client, 'memories') and hasattr(client.memories, 'add'):
-            response = client.memories.add(content=content, metadata=metadata)
-        elif hasattr(client, 'create_memory'):
-            response = client.create_memory(content=content, metadata=metadata)
-        elif hasattr(client, 'add_memory'):
-            response = client.add_memory(content=content, metadata=metadata)
-        else:
-            # Fallback: try direct call with common pattern
-            response = client.create(content=content, metadata=metadata)
-        
-        # Extract memory ID from response
-        if hasattr(response, 'id'):
-            return response.id
-        elif hasattr(response, 'memory_id'):
-            return response.memory_id
-        elif isinstance(response, dict):
-            return response.get('id') or response.get('memory_id') or str(response)
-        else:
-            return str(response)
+def _resolve_create_fn(client) -> Callable[..., Any]:
+    """
+    Probe the SDK for its memory-creation method.
+    
+    Returns:
+        callable: Bound method accepting content= and metadata= keywords
+    """
+    # Try common SDK patterns
+    if hasattr(client, 'memories') and hasattr(client.memories, 'create'):
+        return client.memories.create
+    elif hasattr(client, 'memories') and hasattr(client.memories, 'add'):
+        return client.memories.add
+    elif hasattr(client, 'create_memory'):
+        return client.create_memory
+    elif hasattr(client, 'add_memory'):
+        return client.add_memory
+    else:
+        # Fallback: try direct call with common pattern
+        return client.create
+
+
+def _resolve_delete_fn(client) -> Optional[Callable[..., Any]]:
+    """
+    Probe the SDK for its memory-deletion method.
     
-    return retry(_call, attempts=3)
+    Returns:
+        callable or None: Bound method accepting a memory ID, or None if the
+        SDK exposes no delete method
+    """
+    if hasattr(client, 'memories') and hasattr(client.memories, 'delete'):
+        return client.memories.delete
+    elif hasattr(client, 'memories') and hasattr(client.memories, 'remove'):
+        return client.memories.remove
+    elif hasattr(client, 'delete_memory'):
+        return client.delete_memory
+    return None
 
 
-def ingest_page_to_supermemory(
-    client: Supermemory,
-    file_path: Path,
-    doc_id: str,
-    page_number: int,
-    pdf_path: Path,
-    overwrite: bool = False
-) -> tuple[bool, Optional[str], Optional[str]]:
+def _memory_id_from_response(response) -> str:
+    """Extract the memory ID from a create/add response."""
+    if hasattr(response, 'id'):
+        return response.id
+    elif hasattr(response, 'memory_id'):
+        return response.memory_id
+    elif isinstance(response, dict):
+        return response.get('id') or response.get('memory_id') or str(response)
+    else:
+        return str(response)
+
+
+async def _ingest_page_async(create: Callable, content: str, metadata: Dict) -> str:
+    """Ingest a page through an async SDK create method with retry logic."""
+    async def _call():
+        return _memory_id_from_response(await create(content=content, metadata=metadata))
+    
+    # Wait out an open breaker rather than failing queued pages: a short
+    # rate-limit burst should delay ingestion, not drop pages
+    return await async_retry(_call, attempts=3, breaker=SUPERMEMORY_BREAKER, wait_if_open=True)
+
+
+def _load_page_payload(file_path: Path, doc_id: str, page_number: int, pdf_path: Path) -> tuple[str, Dict]:
     """
-    Ingest a single page into Supermemory.
+    Parse a page JSON file into the content and metadata sent to Supermemory.
     
     Returns:
-        tuple: (success: bool, memory_id: str or None, error: str or None)
+        tuple: (content: str, metadata: dict). content is empty when the page
+        has neither markdown nor raw_response; callers skip such pages.
     """
-    # Parse the JSON file
-    try:
-        data = parse_json_file(file_path)
-    except Exception as e:
-        return False, None, f"Failed to parse JSON: {e}"
-    
-    # Extract content and metadata
-    content = data.get('markdown', '')
-    if not content and 'raw_response' in data:
-        content = data['raw_response']
-    if not content:
-        content = str(data)  # Fallback to string representation
+    data = parse_json_file(file_path)
+    
+    # Extract content and metadata (never upload the dict repr as content)
+    content = data.get('markdown') or data.get('raw_response') or ''
     
     metadata = {
         'doc_id': doc_id,
@@ -113,62 +141,74 @@ def ingest_page_to_supermemory(
         'entities': data.get('entities', []),
         'source_file': str(pdf_path)
     }
-    
-    # Ingest with retry
-    try:
-        memory_id = _ingest_page_with_retry(client, content, metadata)
-        return True, memory_id, None
-    except Exception as e:
-        return False, None, str(e)
+    return content, metadata
 
 
-def ingest_pages_dir(
+def page_content_hash(content: str, metadata: Dict) -> str:
+    """Hash the content and metadata of a page so unchanged pages can be skipped."""
+    h = hashlib.blake2b(digest_size=16)
+    h.update(content.encode('utf-8'))
+    h.update(json.dumps(metadata, sort_keys=True, ensure_ascii=False).encode('utf-8'))
+    return h.hexdigest()
+
+
+def _load_existing_pages(manifest_path: Path, doc_id: str) -> Dict[int, Dict]:
+    """Return successfully ingested entries from a previous manifest, keyed by page."""
+    existing_pages = {}
+    if manifest_path.exists():
+        try:
+            existing_manifest = read_json(manifest_path)
+            if existing_manifest.get('doc_id') == doc_id:
+                for page_entry in existing_manifest.get('pages', []):
+                    if 'page' in page_entry and 'error' not in page_entry:
+                        existing_pages[page_entry['page']] = page_entry
+        except Exception:
+            pass
+    return existing_pages
+
+
+def _scan_page_files(pages_dir: Path) -> List[tuple[Path, int]]:
+    """List page JSON files as (path, page_number), sorted by page number."""
+    page_files = []
+    with os.scandir(pages_dir) as entries:
+        for entry in entries:
+            match = _PAGE_NUM_RE.fullmatch(entry.name)
+            if match and entry.is_file():
+                page_files.append((Path(entry.path), int(match.group(1))))
+    page_files.sort(key=lambda item: item[1])
+    return page_files
+
+
+async def ingest_pages_dir_async(
     pages_dir: Path,
     pdf_path: Path,
     doc_id: str,
     manifest_path: Path,
-    overwrite: bool = False
+    overwrite: bool = False,
+    max_concurrency: int = SUPERMEMORY_INGEST_WORKERS
 ) -> Dict:
     """
     Ingest all page JSON files from a directory into Supermemory.
     
+    Pages are ingested concurrently on the event loop through the async SDK
+    client, bounded by a semaphore; JSON parsing runs in a worker thread.
+    
     Args:
         pages_dir: Directory containing page_*.json files
         pdf_path: Path to original PDF file
         doc_id: Document ID
         manifest_path: Path to save manifest file
         overwrite: Whether to overwrite existing ingested pages
+        max_concurrency: Maximum in-flight Supermemory calls
         
     Returns:
         dict: Manifest with pages list and failures
     """
-    # Initialize Supermemory client
-    if not SUPERMEMORY_API_KEY:
-        raise ValueError("SUPERMEMORY_API_KEY not found in environment variables")
-    
-    client_kwargs = {'api_key': SUPERMEMORY_API_KEY}
-    if SUPERMEMORY_BASE_URL:
-        client_kwargs['base_url'] = SUPERMEMORY_BASE_URL
-    if SUPERMEMORY_WORKSPACE_ID:
-        client_kwargs['workspace_id'] = SUPERMEMORY_WORKSPACE_ID
+    # Loaded even with overwrite so the previous memories can be cleaned up
+    existing_pages = _load_existing_pages(manifest_path, doc_id)
     
-    client = Supermemory(**client_kwargs)
-    
-    # Load existing manifest if it exists
-    existing_pages = {}
-    if manifest_path.exists() and not overwrite:
-        try:
-            with open(manifest_path, 'r', encoding='utf-8') as f:
-                existing_manifest = json.load(f)
-                if existing_manifest.get('doc_id') == doc_id:
-                    for page_entry in existing_manifest.get('pages', []):
-                        if 'page' in page_entry and 'error' not in page_entry:
-                            existing_pages[page_entry['page']] = page_entry
-        except Exception:
-            pass
-    
-    # Find all page JSON files
-    page_files = sorted(glob(str(pages_dir / 'page_*.json')))
+    # Find all page JSON files, parsing page numbers once during the scan
+    page_files = _scan_page_files(pages_dir)
     
     if not page_files:
         return {
@@ -178,59 +218,111 @@ def ingest_pages_dir(
             'failed_pages': []
         }
     
-    # Process pages in parallel for faster ingestion
-    pages = []
-    failed_pages = []
+    semaphore = asyncio.Semaphore(max_concurrency)
+    # Identical page text (repeated boilerplate) is uploaded once per run:
+    # content digest -> (first page number, upload task shared by duplicates)
+    uploads: Dict[bytes, tuple[int, asyncio.Task]] = {}
     
-    def ingest_page_wrapper(file_path_str):
-        """Wrapper for parallel ingestion."""
-        file_path = Path(file_path_str)
-        
-        # Extract page number from filename
-        match = re.search(r'page_(\d+)\.json', file_path.name)
-        if not match:
-            return None, None, None
+    async def upload(create, content, metadata):
+        """Upload one page's content, bounded by the semaphore."""
+        async with semaphore:
+            return await _ingest_page_async(create, content, metadata)
+    
+    async def ingest_page(page_file, create, force=False):
+        """Ingest one page, returning (page_entry, failed_entry); force skips the unchanged check."""
+        file_path, page_number = page_file
         
-        page_number = int(match.group(1))
+        try:
+            content, metadata = await asyncio.to_thread(
+                _load_page_payload, file_path, doc_id, page_number, pdf_path
+            )
+        except Exception as e:
+            return None, {'page': page_number, 'error': f'Failed to parse JSON: {e}'}
+        if not content:
+            logger.warning(f"Page {page_number}: {_EMPTY_PAGE_ERROR}, skipping")
+            return None, {'page': page_number, 'error': _EMPTY_PAGE_ERROR}
+        content_hash = page_content_hash(content, metadata)
         
-        # Skip if already ingested (unless overwrite)
-        if not overwrite and page_number in existing_pages:
-            return page_number, existing_pages[page_number], None
+        # Skip if already ingested with identical content (unless overwrite)
+        existing = existing_pages.get(page_number)
+        if not (force or overwrite) and existing and existing.get('content_hash') == content_hash:
+            return existing, None
         
-        # Ingest page
-        success, memory_id, error = ingest_page_to_supermemory(
-            client, file_path, doc_id, page_number, pdf_path, overwrite
-        )
+        # Ingest page, or share the upload of an identical earlier page
+        digest = hashlib.blake2b(content.encode('utf-8'), digest_size=16).digest()
+        first_page, task = uploads.get(digest, (page_number, None))
+        if task is None:
+            task = asyncio.ensure_future(upload(create, content, metadata))
+            uploads[digest] = (page_number, task)
+        try:
+            memory_id = await task
+        except Exception as e:
+            return None, {'page': page_number, 'error': str(e) or 'Unknown error'}
         
-        if success:
-            return page_number, {
-                'page': page_number,
-                'file': str(file_path),
-                'memory_id': memory_id
-            }, None
-        else:
-            return page_number, None, {'page': page_number, 'error': error or 'Unknown error'}
-    
-    # Process in parallel (10 workers for Supermemory API calls)
-    with ThreadPoolExecutor(max_workers=10) as executor:
-        future_to_file = {
-            executor.submit(ingest_page_wrapper, file_path_str): file_path_str
-            for file_path_str in page_files
+        page_entry = {
+            'page': page_number,
+            'file': str(file_path),
+            'memory_id': memory_id,
+            'content_hash': content_hash,
+            'summary': metadata['summary'],
+            'entities': metadata['entities']
         }
-        
-        for future in as_completed(future_to_file):
+        if first_page != page_number:
+            page_entry['duplicate_of'] = first_page
+        return page_entry, None
+    
+    async def delete_stale(delete, memory_id):
+        """Delete one memory left over from a previous ingestion."""
+        async with semaphore:
             try:
-                page_num, page_entry, failed_entry = future.result()
-                if page_entry:
-                    pages.append(page_entry)
-                elif failed_entry:
-                    failed_pages.append(failed_entry)
+                await async_retry(lambda: delete(memory_id), attempts=3, breaker=SUPERMEMORY_BREAKER, wait_if_open=True)
             except Exception as e:
-                file_path_str = future_to_file[future]
-                failed_pages.append({'page': 0, 'error': f'Ingestion error for {file_path_str}: {e}'})
+                logger.warning(f"Failed to delete stale memory {memory_id}: {e}")
+    
+    # The async client's connections belong to this event loop, so it lives
+    # for one ingestion run rather than being cached for the process
+    async with create_async_supermemory_client() as client:
+        create = _resolve_create_fn(client)
+        results = await asyncio.gather(*(ingest_page(page_file, create) for page_file in page_files))
+        
+        # An unchanged duplicate whose original page changed still shares the
+        # original's old memory (tagged with the original's page number), so
+        # it is uploaded afresh and the old memory can be dropped below
+        by_page = {page_entry['page']: page_entry for page_entry, _ in results if page_entry}
+        orphaned = [
+            i for i, (page_entry, _) in enumerate(results)
+            if page_entry and 'duplicate_of' in page_entry
+            and by_page.get(page_entry['duplicate_of'], {}).get('memory_id') != page_entry['memory_id']
+        ]
+        if orphaned:
+            redone = await asyncio.gather(*(ingest_page(page_files[i], create, force=True) for i in orphaned))
+            for i, result in zip(orphaned, redone):
+                results[i] = result
+        
+        # A page that failed this run keeps its previous entry (and memory),
+        # so a transient outage doesn't drop content that was already ingested
+        for i, (page_entry, failed_entry) in enumerate(results):
+            if page_entry is None and failed_entry and failed_entry['page'] in existing_pages:
+                results[i] = (existing_pages[failed_entry['page']], failed_entry)
+        
+        # Memories from the previous ingestion that no page references any
+        # more (pages re-uploaded with new content, or removed from the
+        # directory) would otherwise linger in Supermemory as duplicates
+        live_ids = {page_entry['memory_id'] for page_entry, _ in results if page_entry}
+        stale_ids = {
+            entry['memory_id'] for entry in existing_pages.values() if entry.get('memory_id')
+        } - live_ids
+        if stale_ids:
+            delete = _resolve_delete_fn(client)
+            if delete is None:
+                logger.warning(f"Supermemory SDK has no delete method; {len(stale_ids)} stale memories left in place")
+            else:
+                await asyncio.gather(*(delete_stale(delete, memory_id) for memory_id in sorted(stale_ids)))
     
-    # Sort pages by page number for consistent output
-    pages.sort(key=lambda x: x['page'])
+    # gather preserves input order, so pages come out sorted; a failed page
+    # with a carried-forward entry appears in both lists
+    pages = [page_entry for page_entry, _ in results if page_entry]
+    failed_pages = [failed_entry for _, failed_entry in results if failed_entry]
     
     # Create manifest
     manifest = {
@@ -240,10 +332,40 @@ def ingest_pages_dir(
         'failed_pages': failed_pages
     }
     
-    # Save manifest
+    # Save manifest; encoding and the write run off the event loop
     manifest_path.parent.mkdir(parents=True, exist_ok=True)
-    with open(manifest_path, 'w', encoding='utf-8') as f:
-        json.dump(manifest, f, indent=2, ensure_ascii=False)
+    await asyncio.to_thread(write_json, manifest_path, manifest)
     
     return manifest
 
+
+def ingest_pages_dir(
+    pages_dir: Path,
+    pdf_path: Path,
+    doc_id: str,
+    manifest_path: Path,
+    overwrite: bool = False
+) -> Dict:
+    """
+    Ingest all page JSON files from a directory into Supermemory.
+    
+    Synchronous wrapper around ingest_pages_dir_async for callers outside an
+    event loop.
+    
+    Args:
+        pages_dir: Directory containing page_*.json files
+        pdf_path: Path to original PDF file
+        doc_id: Document ID
+        manifest_path: Path to save manifest file
+        overwrite: Whether to overwrite existing ingested pages
+        
+    Returns:
+        dict: Manifest with pages list and failures
+    """
+    return asyncio.run(ingest_pages_dir_async(
+        pages_dir=pages_dir,
+        pdf_path=pdf_path,
+        doc_id=doc_id,
+        manifest_path=manifest_path,
+        overwrite=overwrite
+    ))
@@ -1,10 +1,25 @@
 """Utility functions for the pipeline."""
 
+import asyncio
 import json
+import mmap
+import os
+import random
 import re
+import threading
 import time
 from pathlib import Path
-from typing import Callable, Any, Optional
+from typing import Callable, Any, Optional, Tuple, Type, Union
+
+from app.config import BREAKER_FAILURE_THRESHOLD, BREAKER_RESET_SECONDS
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Opening (```json or ```) and closing code fences, matched in a single pass
+_CODE_FENCE_RE = re.compile(r'^```(?:json)?\s*|\s*```$', re.MULTILINE)
 
 
 def strip_code_fences(text: str) -> str:
@@ -20,15 +35,7 @@ def strip_code_fences(text: str) -> str:
     if not text:
         return text
     
-    # Remove ```json fences
-    text = re.sub(r'^```json\s*', '', text, flags=re.MULTILINE)
-    text = re.sub(r'\s*```$', '', text, flags=re.MULTILINE)
-    
-    # Remove generic ``` fences
-    text = re.sub(r'^```\s*', '', text, flags=re.MULTILINE)
-    text = re.sub(r'\s*```$', '', text, flags=re.MULTILINE)
-    
-    return text.strip()
+    return _CODE_FENCE_RE.sub('', text).strip()
 
 
 def safe_json_loads(text: str) -> Optional[dict]:
@@ -48,26 +55,256 @@ def safe_json_loads(text: str) -> Optional[dict]:
     cleaned = strip_code_fences(text)
     
     try:
-        return json.loads(cleaned)
+        return json_loads(cleaned)
     except json.JSONDecodeError:
         return None
 
 
-def retry(fn: Callable, attempts: int = 3, backoff: list = None, *args, **kwargs) -> Any:
+def json_loads(data: Union[str, bytes]) -> Any:
+    """
+    Parse JSON, using orjson when it is installed.
+    
+    orjson.JSONDecodeError subclasses json.JSONDecodeError, so callers can
+    catch json.JSONDecodeError either way.
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+# JSON files at least this large are parsed from an mmap (orjson only)
+_MMAP_MIN_BYTES = 64 * 1024
+
+
+def read_json(path: Path) -> Any:
+    """
+    Read and parse a UTF-8 JSON file.
+    
+    With orjson, files of _MMAP_MIN_BYTES or more are parsed straight from an
+    mmap of the file, so no intermediate bytes copy is allocated.
+    """
+    if orjson is not None:
+        with open(path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size < _MMAP_MIN_BYTES:
+                return orjson.loads(f.read())
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                with memoryview(mm) as view:
+                    return orjson.loads(view)
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def write_json(path: Path, data: Any) -> None:
+    """Write data as indented UTF-8 JSON (non-ASCII characters unescaped)."""
+    if orjson is not None:
+        path.write_bytes(orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+        return
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised when a call is rejected because its circuit breaker is open."""
+
+
+class CircuitBreaker:
+    """
+    Thread-safe circuit breaker for one external service.
+    
+    After failure_threshold consecutive failures the breaker opens for
+    reset_seconds. Once that expires it is half-open: a single probe call is
+    let through, and its outcome closes or re-opens the breaker.
+    """
+    
+    # Seconds between re-checks while another caller's probe is in flight
+    PROBE_POLL_SECONDS = 0.5
+    
+    def __init__(self, name: str, failure_threshold: int = 5, reset_seconds: float = 30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self._failures = 0
+        self._open_until = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+    
+    def acquire(self) -> float:
+        """
+        Ask to make a call.
+        
+        Returns:
+            float: 0 if the call may proceed (possibly as the half-open probe),
+            otherwise the number of seconds to wait before asking again
+        """
+        with self._lock:
+            if not self._open_until:
+                return 0.0
+            remaining = self._open_until - time.monotonic()
+            if remaining > 0:
+                return remaining
+            if self._probing:
+                return min(self.PROBE_POLL_SECONDS, self.reset_seconds)
+            self._probing = True
+            return 0.0
+    
+    def check(self) -> None:
+        """Raise CircuitOpenError if a call may not be made right now."""
+        remaining = self.acquire()
+        if remaining > 0:
+            raise CircuitOpenError(f"{self.name} circuit open for another {remaining:.1f}s")
+    
+    def record_success(self) -> None:
+        """Close the breaker and reset the consecutive failure count."""
+        with self._lock:
+            self._failures = 0
+            self._open_until = 0.0
+            self._probing = False
+    
+    def release_probe(self) -> None:
+        """
+        Give up a half-open probe that ended without an outcome (e.g. cancelled).
+        
+        Without this the breaker would stay half-open with a probe that never
+        reports back, turning every later caller away.
+        """
+        with self._lock:
+            self._probing = False
+    
+    def record_failure(self, count: bool = True) -> None:
+        """
+        Record a failed call.
+        
+        Args:
+            count: Whether the failure counts toward the threshold. Retries
+                pass False so one caller's retries count as a single failure;
+                a failed half-open probe re-opens the breaker regardless.
+        """
+        with self._lock:
+            if self._probing:
+                self._probing = False
+                self._failures = 0
+                self._open_until = time.monotonic() + self.reset_seconds
+                return
+            if not count:
+                return
+            self._failures += 1
+            if self._failures >= self.failure_threshold:
+                self._open_until = time.monotonic() + self.reset_seconds
+                self._failures = 0
+
+
+# Shared by every Supermemory caller (ingestion and QA)
+SUPERMEMORY_BREAKER = CircuitBreaker("Supermemory", BREAKER_FAILURE_THRESHOLD, BREAKER_RESET_SECONDS)
+
+
+def _backoff_wait(backoff: list, attempt: int) -> float:
+    """Full-jitter wait: uniform between 0 and the backoff step for this attempt."""
+    return random.uniform(0, backoff[min(attempt, len(backoff) - 1)])
+
+
+def retry(
+    fn: Callable,
+    attempts: int = 3,
+    backoff: list = None,
+    *args,
+    breaker: Optional[CircuitBreaker] = None,
+    no_retry: Tuple[Type[BaseException], ...] = (),
+    **kwargs
+) -> Any:
     """
-    Retry a function call with exponential backoff.
+    Retry a function call with jittered exponential backoff.
     
     Args:
         fn: Function to call
         attempts: Number of retry attempts
-        backoff: List of wait times in seconds (default: [1, 2, 4])
+        backoff: List of maximum wait times in seconds (default: [1, 2, 4])
         *args: Positional arguments to pass to fn
+        breaker: Optional circuit breaker; when open, fails fast without calling fn
+        no_retry: Exception types raised at once, without retrying or recording
+            a breaker outcome (they say nothing about the service's health)
         **kwargs: Keyword arguments to pass to fn
         
     Returns:
         Result of fn call
         
     Raises:
+        CircuitOpenError: If the breaker is open
+        Exception: If all attempts fail, raises the last exception
+    """
+    if backoff is None:
+        backoff = [1, 2, 4]
+    
+    last_exception = None
+    for attempt in range(attempts):
+        if breaker is not None:
+            try:
+                breaker.check()
+            except CircuitOpenError:
+                # Surface the real failure if the breaker opened mid-retry
+                if last_exception is not None:
+                    raise last_exception
+                raise
+        try:
+            result = fn(*args, **kwargs)
+        except no_retry:
+            # Not a service outcome: free a held probe and give up at once
+            if breaker is not None:
+                breaker.release_probe()
+            raise
+        except Exception as e:
+            last_exception = e
+            if breaker is not None:
+                # This call's own retries count as one consecutive failure
+                breaker.record_failure(count=attempt == 0)
+            if attempt < attempts - 1:
+                time.sleep(_backoff_wait(backoff, attempt))
+            else:
+                raise last_exception
+        except BaseException:
+            # Interrupted: no outcome to record, but free a held probe
+            if breaker is not None:
+                breaker.release_probe()
+            raise
+        else:
+            if breaker is not None:
+                breaker.record_success()
+            return result
+    
+    raise last_exception
+
+
+async def async_retry(
+    fn: Callable,
+    attempts: int = 3,
+    backoff: list = None,
+    *args,
+    breaker: Optional[CircuitBreaker] = None,
+    wait_if_open: bool = False,
+    no_retry: Tuple[Type[BaseException], ...] = (),
+    **kwargs
+) -> Any:
+    """
+    Retry a coroutine function with jittered exponential backoff.
+    
+    Same semantics as retry(), but awaits fn and sleeps with asyncio.sleep
+    so waiting does not block the event loop. With wait_if_open, an open
+    breaker is waited out (without using up attempts) instead of failing.
+    
+    Args:
+        fn: Coroutine function to call
+        attempts: Number of retry attempts
+        backoff: List of maximum wait times in seconds (default: [1, 2, 4])
+        *args: Positional arguments to pass to fn
+        breaker: Optional circuit breaker; when open, fails fast without calling fn
+        wait_if_open: Sleep until the breaker lets a call through instead of failing fast
+        no_retry: Exception types raised at once, as in retry()
+        **kwargs: Keyword arguments to pass to fn
+        
+    Returns:
+        Result of awaiting fn
+        
+    Raises:
+        CircuitOpenError: If the breaker is open and wait_if_open is False
         Exception: If all attempts fail, raises the last exception
     """
     if backoff is None:
@@ -75,15 +312,41 @@ def retry(fn: Callable, attempts: int = 3, backoff: list = None, *args, **kwargs
     
     last_exception = None
     for attempt in range(attempts):
+        if breaker is not None:
+            wait = breaker.acquire()
+            while wait > 0:
+                if not wait_if_open:
+                    # Surface the real failure if the breaker opened mid-retry
+                    if last_exception is not None:
+                        raise last_exception
+                    raise CircuitOpenError(f"{breaker.name} circuit open for another {wait:.1f}s")
+                await asyncio.sleep(wait)
+                wait = breaker.acquire()
         try:
-            return fn(*args, **kwargs)
+            result = await fn(*args, **kwargs)
+        except no_retry:
+            # Not a service outcome: free a held probe and give up at once
+            if breaker is not None:
+                breaker.release_probe()
+            raise
         except Exception as e:
             last_exception = e
+            if breaker is not None:
+                # This call's own retries count as one consecutive failure
+                breaker.record_failure(count=attempt == 0)
             if attempt < attempts - 1:
-                wait_time = backoff[min(attempt, len(backoff) - 1)]
-                time.sleep(wait_time)
+                await asyncio.sleep(_backoff_wait(backoff, attempt))
             else:
                 raise last_exception
+        except BaseException:
+            # Cancelled or interrupted: no outcome to record, but free a held probe
+            if breaker is not None:
+                breaker.release_probe()
+            raise
+        else:
+            if breaker is not None:
+                breaker.record_success()
+            return result
     
     raise last_exception
 
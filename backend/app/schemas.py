@@ -1,19 +1,34 @@
 """Pydantic schemas for API request/response models."""
 
-from pydantic import BaseModel, Field
+from dataclasses import dataclass
+from pydantic import BaseModel, ConfigDict, Field
 from typing import List, Optional
 
 
 class ChatRequest(BaseModel):
     """Request schema for /chat endpoint."""
+    model_config = ConfigDict(frozen=True, extra='forbid', str_strip_whitespace=True)
+    
     doc_id: str = Field(..., description="Document ID")
     question: str = Field(..., description="Question to answer")
     top_k: int = Field(default=8, ge=1, le=50, description="Number of top results to retrieve")
     max_chars_per_page: int = Field(default=1500, ge=100, le=10000, description="Maximum characters per page in evidence pack")
 
 
+class ChatBatchRequest(BaseModel):
+    """Request schema for /chat/batch endpoint."""
+    model_config = ConfigDict(frozen=True, extra='forbid', str_strip_whitespace=True)
+    
+    doc_id: str = Field(..., description="Document ID")
+    questions: List[str] = Field(..., min_length=1, max_length=20, description="Questions to answer")
+    top_k: int = Field(default=8, ge=1, le=50, description="Number of top results to retrieve per question")
+    max_chars_per_page: int = Field(default=1500, ge=100, le=10000, description="Maximum characters per page in evidence pack")
+
+
 class RetrievedPage(BaseModel):
     """Schema for a retrieved page in chat response."""
+    model_config = ConfigDict(frozen=True)
+    
     page: int = Field(..., description="Page number")
     memory_id: str = Field(..., description="Supermemory memory ID")
     excerpt: str = Field(..., description="Excerpt from the page (first 250 chars)")
@@ -21,19 +36,26 @@ class RetrievedPage(BaseModel):
 
 class ChatResponse(BaseModel):
     """Response schema for /chat endpoint."""
+    model_config = ConfigDict(frozen=True)
+    
     doc_id: str = Field(..., description="Document ID")
     answer_md: str = Field(..., description="Answer in markdown format with citations")
     retrieved: List[RetrievedPage] = Field(..., description="List of retrieved pages")
 
 
-class FailedPage(BaseModel):
+# A plain slotted dataclass rather than a model: it only carries pipeline
+# output, and Pydantic still serializes and documents it as a nested field
+@dataclass(frozen=True, slots=True)
+class FailedPage:
     """Schema for a failed page in ingest response."""
-    page: int = Field(..., description="Page number")
-    error: str = Field(..., description="Error message")
+    page: int
+    error: str
 
 
 class IngestResponse(BaseModel):
     """Response schema for /ingest endpoint."""
+    model_config = ConfigDict(frozen=True)
+    
     doc_id: str = Field(..., description="Generated document ID")
     pages_total: int = Field(..., description="Total number of pages processed")
     pages_ingested: int = Field(..., description="Number of successfully ingested pages")
@@ -43,5 +65,7 @@ class IngestResponse(BaseModel):
 
 class HealthResponse(BaseModel):
     """Response schema for /health endpoint."""
+    model_config = ConfigDict(frozen=True)
+    
     ok: bool = Field(..., description="Health status")
 
@@ -0,0 +1,115 @@
+"""Tests for the Supermemory circuit breaker and the retry helpers that drive it.
+
+Run from backend/: python -m unittest discover tests
+"""
+
+import asyncio
+import time
+import unittest
+
+from app.pipeline.utils import CircuitBreaker, CircuitOpenError, async_retry, retry
+
+
+def _open_then_expire(breaker: CircuitBreaker) -> None:
+    """Trip the breaker and wait until it is half-open."""
+    for _ in range(breaker.failure_threshold):
+        breaker.record_failure()
+    time.sleep(breaker.reset_seconds + 0.01)
+
+
+class CircuitBreakerTest(unittest.TestCase):
+    def setUp(self):
+        self.breaker = CircuitBreaker("test", failure_threshold=2, reset_seconds=0.05)
+
+    def test_opens_after_threshold_and_success_closes(self):
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.acquire(), 0.0)
+        self.breaker.record_failure()
+        self.assertRaises(CircuitOpenError, self.breaker.check)
+
+        time.sleep(0.06)
+        self.assertEqual(self.breaker.acquire(), 0.0)  # the half-open probe
+        self.assertGreater(self.breaker.acquire(), 0.0)  # others wait on it
+        self.breaker.record_success()
+        self.assertEqual(self.breaker.acquire(), 0.0)
+        self.assertEqual(self.breaker.acquire(), 0.0)
+
+    def test_failed_probe_reopens(self):
+        _open_then_expire(self.breaker)
+        self.assertEqual(self.breaker.acquire(), 0.0)
+        self.breaker.record_failure(count=False)
+        self.assertRaises(CircuitOpenError, self.breaker.check)
+
+    def test_retries_of_one_call_count_once(self):
+        def fail():
+            raise IOError("429")
+
+        self.assertRaises(IOError, retry, fail, 3, [0], breaker=self.breaker)
+        # Three failed attempts, but a threshold of 2 is not reached
+        self.assertEqual(self.breaker.acquire(), 0.0)
+
+    def test_cancelled_probe_is_released(self):
+        _open_then_expire(self.breaker)
+
+        async def hang():
+            await asyncio.sleep(10)
+
+        async def cancel_probe():
+            task = asyncio.ensure_future(async_retry(hang, 1, breaker=self.breaker))
+            await asyncio.sleep(0.01)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+
+        asyncio.run(cancel_probe())
+
+        # The next caller becomes the probe instead of waiting forever
+        async def ok():
+            return "ok"
+
+        # (a probe stuck in flight would make this poll forever)
+        result = asyncio.run(asyncio.wait_for(
+            async_retry(ok, 1, breaker=self.breaker, wait_if_open=True), timeout=2
+        ))
+        self.assertEqual(result, "ok")
+        self.assertEqual(self.breaker.acquire(), 0.0)
+
+    def test_interrupted_sync_probe_is_released(self):
+        _open_then_expire(self.breaker)
+
+        def interrupt():
+            raise KeyboardInterrupt
+
+        self.assertRaises(KeyboardInterrupt, retry, interrupt, 1, breaker=self.breaker)
+        self.assertEqual(retry(lambda: "ok", 1, breaker=self.breaker), "ok")
+
+    def test_no_retry_records_no_outcome(self):
+        calls = []
+
+        def unsupported():
+            calls.append(1)
+            raise TypeError("unexpected keyword argument 'queries'")
+
+        # A half-open probe that hits a no_retry error neither closes the breaker...
+        _open_then_expire(self.breaker)
+        self.assertRaises(TypeError, retry, unsupported, 3, [0], breaker=self.breaker, no_retry=(TypeError,))
+        self.assertEqual(calls, [1])
+        # ...nor keeps the probe slot: the next caller probes, and its failure re-opens
+        self.assertEqual(self.breaker.acquire(), 0.0)
+        self.breaker.record_failure()
+        self.assertRaises(CircuitOpenError, self.breaker.check)
+
+    def test_wait_if_open_waits_out_the_breaker(self):
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+
+        async def ok():
+            return "ok"
+
+        with self.assertRaises(CircuitOpenError):
+            asyncio.run(async_retry(ok, 1, breaker=self.breaker))
+        self.assertEqual(asyncio.run(async_retry(ok, 1, breaker=self.breaker, wait_if_open=True)), "ok")
+
+
+if __name__ == "__main__":
+    unittest.main()
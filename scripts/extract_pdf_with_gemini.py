@@ -11,10 +11,16 @@ import time
 from pathlib import Path
 from datetime import datetime
 from dotenv import load_dotenv
-import google.generativeai as genai
 from pdf2image import convert_from_path
 from PIL import Image
 
+# orjson is optional; it only speeds up JSON parsing/writing
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 # Load environment variables
 load_dotenv()
 
@@ -37,6 +43,25 @@ Given an image of a document page:
   - summary"""
 
 
+def read_json(file_path):
+    """Read a UTF-8 JSON file (orjson when available)."""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(Path(file_path).read_bytes())
+    with open(file_path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def write_json(file_path, data):
+    """Write data as indented UTF-8 JSON (orjson when available)."""
+    if ORJSON_AVAILABLE:
+        Path(file_path).write_bytes(
+            orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE)
+        )
+        return
+    with open(file_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+
+
 def get_poppler_path():
     """Get Poppler path from .env file or environment variables."""
     from dotenv import dotenv_values
@@ -118,8 +143,7 @@ def process_page(page_num, pdf_path, dpi, output_pages_dir, model, overwrite, sl
     if not overwrite and page_json_path.exists():
         print(f"  Page {page_num}: Skipping (JSON already exists)")
         try:
-            with open(page_json_path, "r", encoding="utf-8") as f:
-                return True, None, json.load(f)
+            return True, None, read_json(page_json_path)
         except Exception as e:
             print(f"  Page {page_num}: Warning - Could not read existing JSON: {e}")
     
@@ -176,7 +200,7 @@ def process_page(page_num, pdf_path, dpi, output_pages_dir, model, overwrite, sl
             if end != -1:
                 response_text = response_text[start:end].strip()
         
-        response_json = json.loads(response_text)
+        response_json = orjson.loads(response_text) if ORJSON_AVAILABLE else json.loads(response_text)
     except json.JSONDecodeError:
         # If response is not valid JSON, wrap it
         response_json = {
@@ -189,8 +213,7 @@ def process_page(page_num, pdf_path, dpi, output_pages_dir, model, overwrite, sl
     
     # Save JSON response
     try:
-        with open(page_json_path, "w", encoding="utf-8") as f:
-            json.dump(response_json, f, indent=2, ensure_ascii=False)
+        write_json(page_json_path, response_json)
         print(f"  Page {page_num}: JSON saved to {page_json_path.name}")
     except Exception as e:
         return False, f"Error saving JSON for page {page_num}: {e}", None
@@ -217,8 +240,7 @@ def create_manifest(pdf_path, total_pages, processed_pages, failed_pages, model_
     }
     
     manifest_path = output_dir / "manifest.json"
-    with open(manifest_path, "w", encoding="utf-8") as f:
-        json.dump(manifest, f, indent=2, ensure_ascii=False)
+    write_json(manifest_path, manifest)
     
     print(f"\nManifest saved to: {manifest_path}")
 
@@ -233,8 +255,7 @@ def create_combined_markdown(processed_pages, output_dir):
             json_path = output_pages_dir / f"page_{page_num:03d}.json"
             if json_path.exists():
                 try:
-                    with open(json_path, "r", encoding="utf-8") as jf:
-                        page_data = json.load(jf)
+                    page_data = read_json(json_path)
                     
                     # Write page header
                     f.write(f"# Page {page_num}\n\n")
@@ -318,7 +339,9 @@ def main():
         print("Please create a .env file with: GEMINI_API_KEY=your_key_here")
         return
     
-    # Configure Gemini
+    # Configure Gemini (imported here so --help and usage errors don't pay
+    # for loading the SDK)
+    import google.generativeai as genai
     genai.configure(api_key=api_key)
     model = genai.GenerativeModel(
         model_name=GEMINI_MODEL,
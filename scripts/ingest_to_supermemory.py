@@ -7,10 +7,11 @@ STEP 3: Ingests page JSON files into Supermemory with metadata.
 
 import argparse
 import json
+import mmap
 import os
 import re
 import time
-from glob import glob
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from dotenv import load_dotenv
 
@@ -20,12 +21,43 @@ project_root = Path(__file__).parent.parent
 env_path = project_root / '.env'
 load_dotenv(dotenv_path=env_path)
 
+# orjson is optional; it only speeds up JSON parsing/writing
 try:
-    from supermemory import Supermemory
-    SUPERMEMORY_AVAILABLE = True
+    import orjson
+    ORJSON_AVAILABLE = True
 except ImportError:
-    SUPERMEMORY_AVAILABLE = False
-    print("Warning: supermemory package not found. Install with: pip install supermemory")
+    ORJSON_AVAILABLE = False
+
+PAGE_FILE_RE = re.compile(r'page_(\d+)\.json')
+# Markdown code fences around Gemini JSON output (stripped once per page)
+FENCE_OPEN_RE = re.compile(r'^```json\s*', re.MULTILINE)
+FENCE_CLOSE_RE = re.compile(r'\s*```$', re.MULTILINE)
+
+
+# Page JSON files at least this large are parsed from an mmap (orjson only)
+MMAP_MIN_BYTES = 64 * 1024
+
+
+def read_json(file_path):
+    """Read a UTF-8 JSON file (orjson when available; mmap for large files)."""
+    if ORJSON_AVAILABLE:
+        with open(file_path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size < MMAP_MIN_BYTES:
+                return orjson.loads(f.read())
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                with memoryview(mm) as view:
+                    return orjson.loads(view)
+    with open(file_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def write_json(file_path, data):
+    """Write data as indented UTF-8 JSON (orjson when available)."""
+    if ORJSON_AVAILABLE:
+        Path(file_path).write_bytes(orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+        return
+    with open(file_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
 
 
 def parse_json_file(file_path):
@@ -36,8 +68,7 @@ def parse_json_file(file_path):
         dict: Parsed data with 'markdown', 'entities', 'summary', 'page_number'
               If parsing fails, returns {'markdown': raw_content}
     """
-    with open(file_path, 'r', encoding='utf-8') as f:
-        outer_data = json.load(f)
+    outer_data = read_json(file_path)
     
     # Extract raw_response if present
     raw_response = outer_data.get('raw_response', '')
@@ -46,12 +77,12 @@ def parse_json_file(file_path):
     if raw_response:
         # Strip ```json fences if present
         content = raw_response.strip()
-        content = re.sub(r'^```json\s*', '', content, flags=re.MULTILINE)
-        content = re.sub(r'\s*```$', '', content, flags=re.MULTILINE)
+        content = FENCE_OPEN_RE.sub('', content)
+        content = FENCE_CLOSE_RE.sub('', content)
         content = content.strip()
         
         try:
-            inner_data = json.loads(content)
+            inner_data = orjson.loads(content) if ORJSON_AVAILABLE else json.loads(content)
             # Merge with outer data, preferring inner data
             result = {**outer_data, **inner_data}
             return result
@@ -90,11 +121,11 @@ def ingest_page_to_supermemory(client, file_path, doc_id, page_number, pdf_path,
         return False, None, f"Failed to parse JSON: {e}"
     
     # Extract content and metadata
-    content = data.get('markdown', '')
-    if not content and 'raw_response' in data:
-        content = data['raw_response']
+    # Never upload the dict repr as content; skip pages with no text instead
+    content = data.get('markdown') or data.get('raw_response') or ''
     if not content:
-        content = str(data)  # Fallback to string representation
+        print(f"  Page {page_number}: Warning: no markdown or raw_response content, skipping")
+        return False, None, "Page has no markdown or raw_response content"
     
     metadata = {
         'doc_id': doc_id,
@@ -146,8 +177,7 @@ def load_manifest(manifest_path):
     """Load existing manifest or create new one."""
     if manifest_path.exists():
         try:
-            with open(manifest_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            return read_json(manifest_path)
         except Exception:
             pass
     
@@ -169,8 +199,7 @@ def save_manifest(manifest_path, doc_id, pdf_path, pages):
     }
     
     manifest_path.parent.mkdir(parents=True, exist_ok=True)
-    with open(manifest_path, 'w', encoding='utf-8') as f:
-        json.dump(manifest, f, indent=2, ensure_ascii=False)
+    write_json(manifest_path, manifest)
 
 
 def smoke_test(client, query):
@@ -268,6 +297,12 @@ def main():
         action='store_true',
         help='Overwrite existing ingested pages (default: skip already ingested pages)'
     )
+    parser.add_argument(
+        '--concurrency',
+        type=int,
+        default=8,
+        help='Number of pages to ingest in parallel (default: 8)'
+    )
     parser.add_argument(
         '--smoke_test_query',
         default='Summarize the document',
@@ -276,8 +311,11 @@ def main():
     
     args = parser.parse_args()
     
-    # Check if Supermemory is available
-    if not SUPERMEMORY_AVAILABLE:
+    # Import the SDK only after argument parsing so --help and usage errors
+    # don't pay for loading it
+    try:
+        from supermemory import Supermemory
+    except ImportError:
         print("Error: supermemory package is not installed.")
         print("Install it with: pip install supermemory")
         return 1
@@ -334,7 +372,14 @@ def main():
         print(f"Error: Pages directory not found: {pages_dir}")
         return 1
     
-    page_files = sorted(glob(str(pages_dir / 'page_*.json')))
+    # Single os.scandir pass (no per-file stat); parse page numbers once here
+    page_files = []
+    with os.scandir(pages_dir) as entries:
+        for entry in entries:
+            match = PAGE_FILE_RE.fullmatch(entry.name)
+            if match and entry.is_file():
+                page_files.append((entry.path, int(match.group(1))))
+    page_files.sort(key=lambda item: item[1])
     if not page_files:
         print(f"Warning: No page_*.json files found in {pages_dir}")
         return 0
@@ -348,42 +393,38 @@ def main():
     successful = 0
     failed = 0
     
-    for file_path in page_files:
-        # Extract page number from filename
-        match = re.search(r'page_(\d+)\.json', file_path)
-        if not match:
-            print(f"Warning: Could not extract page number from {file_path}")
-            continue
-        
-        page_number = int(match.group(1))
-        
+    # Collect pages to ingest
+    to_ingest = []
+    for file_path, page_number in page_files:
         # Skip if already ingested (unless overwrite)
         if not args.overwrite and page_number in existing_pages:
             print(f"  Page {page_number}: Skipping (already ingested)")
             continue
         
-        print(f"  Page {page_number}: Ingesting...", end=' ', flush=True)
-        
-        # Ingest page
-        success, memory_id, error = ingest_page_to_supermemory(
-            client, file_path, doc_id, page_number, args.pdf_path
-        )
+        to_ingest.append((file_path, page_number))
+    
+    def ingest_one(item):
+        """Ingest one page; retries/backoff stay inside each task."""
+        file_path, page_number = item
+        return ingest_page_to_supermemory(client, file_path, doc_id, page_number, args.pdf_path)
+    
+    # Ingest pages concurrently (HTTP-bound); map returns results in page order
+    print(f"Ingesting {len(to_ingest)} pages with concurrency {args.concurrency}...")
+    with ThreadPoolExecutor(max_workers=max(1, args.concurrency)) as executor:
+        results = executor.map(ingest_one, to_ingest)
         
-        if success:
-            print(f"✓ (Memory ID: {memory_id})")
-            # Update or add page entry
-            page_entry = {'page': page_number, 'file': file_path, 'memory_id': memory_id}
-            # Remove old entry if exists
-            pages = [p for p in pages if p.get('page') != page_number]
-            pages.append(page_entry)
-            successful += 1
-        else:
-            print(f"✗ Error: {error}")
-            page_entry = {'page': page_number, 'file': file_path, 'error': error}
+        for (file_path, page_number), (success, memory_id, error) in zip(to_ingest, results):
+            if success:
+                print(f"  Page {page_number}: ✓ (Memory ID: {memory_id})")
+                page_entry = {'page': page_number, 'file': file_path, 'memory_id': memory_id}
+                successful += 1
+            else:
+                print(f"  Page {page_number}: ✗ Error: {error}")
+                page_entry = {'page': page_number, 'file': file_path, 'error': error}
+                failed += 1
             # Remove old entry if exists
             pages = [p for p in pages if p.get('page') != page_number]
             pages.append(page_entry)
-            failed += 1
     
     # Save manifest
     save_manifest(manifest_path, doc_id, args.pdf_path, pages)
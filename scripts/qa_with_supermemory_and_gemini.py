@@ -19,19 +19,9 @@ project_root = Path(__file__).parent.parent
 env_path = project_root / '.env'
 load_dotenv(dotenv_path=env_path)
 
-try:
-    import google.generativeai as genai
-    GEMINI_AVAILABLE = True
-except ImportError:
-    GEMINI_AVAILABLE = False
-    print("Warning: google-generativeai package not found. Install with: pip install google-generativeai")
-
-try:
-    from supermemory import Supermemory
-    SUPERMEMORY_AVAILABLE = True
-except ImportError:
-    SUPERMEMORY_AVAILABLE = False
-    print("Warning: supermemory package not found. Install with: pip install supermemory")
+# The Gemini SDK is imported in main() after argument parsing, so --help and
+# usage errors don't pay for loading it
+genai = None
 
 
 def load_manifest(manifest_path):
@@ -232,14 +222,12 @@ Rewritten search terms:"""
     return question
 
 
-def build_evidence_pack(results, manifest, doc_id, max_chars_per_page):
+def build_evidence_pack(infos, max_chars_per_page):
     """
-    Build evidence pack string from retrieved results.
+    Build evidence pack string from extracted result info.
     
     Args:
-        results: List of Supermemory result objects
-        manifest: Manifest dict
-        doc_id: Document ID
+        infos: List of (memory_id, page_number, content) tuples from extract_result_info
         max_chars_per_page: Maximum characters per page
     
     Returns:
@@ -247,13 +235,7 @@ def build_evidence_pack(results, manifest, doc_id, max_chars_per_page):
     """
     evidence_sections = []
     
-    for result in results:
-        info = extract_result_info(result, manifest)
-        if info is None:
-            continue
-        
-        memory_id, page_number, content = info
-        
+    for memory_id, page_number, content in infos:
         # Skip if content is None or empty (shouldn't happen after fix, but be safe)
         if not content or not isinstance(content, str):
             continue
@@ -405,13 +387,18 @@ def main():
     
     args = parser.parse_args()
     
-    # Check dependencies
-    if not GEMINI_AVAILABLE:
+    # Import dependencies
+    global genai
+    try:
+        import google.generativeai as genai
+    except ImportError:
         print("Error: google-generativeai package is not installed.")
         print("Install it with: pip install google-generativeai")
         return 1
     
-    if not SUPERMEMORY_AVAILABLE:
+    try:
+        from supermemory import Supermemory
+    except ImportError:
         print("Error: supermemory package is not installed.")
         print("Install it with: pip install supermemory")
         return 1
@@ -490,9 +477,12 @@ def main():
     
     print(f"Retrieved {len(results)} results")
     
+    # Extract result fields once for both the evidence pack and the output
+    infos = [info for info in (extract_result_info(r, manifest) for r in results) if info]
+    
     # Build evidence pack
     print("Building evidence pack...")
-    evidence_pack = build_evidence_pack(results, manifest, doc_id, args.max_chars_per_page)
+    evidence_pack = build_evidence_pack(infos, args.max_chars_per_page)
     
     if not evidence_pack:
         print("Error: Could not extract content from retrieved results.")
@@ -512,12 +502,7 @@ def main():
         return 1
     
     # Extract retrieved pages info for output
-    retrieved_pages = []
-    for result in results:
-        info = extract_result_info(result, manifest)
-        if info:
-            memory_id, page_number, _ = info
-            retrieved_pages.append((page_number, memory_id))
+    retrieved_pages = [(page_number, memory_id) for memory_id, page_number, _ in infos]
     
     # Save answer
     output_dir = project_root / 'output' / 'answers'